@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for classify_categories: the original any() keyword chains
+vs the precompiled single-pass keyword regex
+
+Usage: python3 benchmarks/bench_classifier.py [--events 5000] [--repeat 5]
+"""
+
+import argparse
+import random
+import re
+import time
+
+from common import load_script
+from fixtures import DESCRIPTIONS, ORGS, TITLE_WORDS
+
+scraper = load_script("scrape-connections-events.py")
+
+def legacy_classify_categories(title, description):
+    """classify_categories before the precompiled classifier, returning the full list"""
+    text = f"{title} {description}".lower()
+    cats = []
+
+    cats.append("Campus Events")
+
+    if any(word in text for word in ["pizza", "bodo", "bagel", "food", "lunch", "dinner", "snacks", "feast"]):
+        if "free" in text or "no cost" in text or "provided" in text:
+            cats.append("Free Food")
+
+    if any(word in text for word in ["5k", "run", "race", "game", "tournament", "intramural", "sports"]):
+        cats.append("Sports")
+
+    if any(word in text for word in ["concert", "showcase", "performance", "ensemble", "dance", "arts", "a cappella", "theater", "music"]):
+        cats.append("Arts")
+        cats.append("Entertainment")
+    elif any(word in text for word in ["party", "social", "mixer", "movie"]):
+        cats.append("Entertainment")
+
+    if any(word in text for word in ["club", "council", "association", "student org", "@ uva", "at uva"]):
+        cats.append("Club Events")
+
+    return cats
+
+def legacy_guess_org_name(title, description):
+    """guess_org_name before its patterns were precompiled"""
+    m = re.search(r"([A-Z][A-Za-z0-9 '&]+ @ UVA)", description)
+    if m:
+        return m.group(1)
+
+    m = re.search(r"([A-Z][A-Za-z0-9 '&]+ at UVA)", description)
+    if m:
+        return m.group(1)
+
+    if "UVA" in title:
+        chop_words = ["Showcase", "Concert", "Competition", "Event", "Workshop"]
+        part = title
+        for w in chop_words:
+            idx = part.find(w)
+            if idx != -1:
+                part = part[:idx]
+                break
+        return part.strip(" -:,")
+
+    return None
+
+FILLER = [
+    "Students from across Grounds are welcome", "Space is limited", "Bring your student ID",
+    "Co-sponsored by the Office of the Dean of Students", "Brunch and coffee will follow",
+    "Registration closes Friday", "The event is open to the Charlottesville community",
+]
+
+def synthetic_events(count, seed=0):
+    """(title, description) pairs shaped like scraped Connections events"""
+    rng = random.Random(seed)
+    events = []
+    for n in range(count):
+        org = rng.choice(ORGS)
+        title = f"{org} {rng.choice(TITLE_WORDS)}"
+        sentences = [rng.choice(DESCRIPTIONS).format(org=org)] + rng.sample(FILLER, rng.randint(1, 4))
+        events.append((title, ". ".join(sentences) + "."))
+    return events
+
+def best_time(fn, events, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for title, description in events:
+            fn(title, description)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=5000, help="Synthetic events to classify")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per implementation (best is reported)")
+    args = parser.parse_args()
+
+    events = synthetic_events(args.events)
+    print(f"🏷️  Classifying {len(events)} synthetic events (best of {args.repeat})\n")
+
+    for label, legacy, current in [
+        ("classify_categories", legacy_classify_categories, scraper.classify_categories),
+        ("guess_org_name", legacy_guess_org_name, scraper.guess_org_name),
+    ]:
+        old = best_time(legacy, events, args.repeat)
+        new = best_time(current, events, args.repeat)
+        print(f"   {label:<20} legacy {old * 1000:7.1f}ms   current {new * 1000:7.1f}ms   {old / new:4.1f}x")
+
+    differing = [(t, d) for t, d in events
+                 if legacy_classify_categories(t, d) != scraper.classify_categories(t, d)]
+    print(f"\n   Category lists differing from substring matching: {len(differing)}")
+    for title, description in differing[:3]:
+        print(f"   - {title}: {legacy_classify_categories(title, description)} -> "
+              f"{scraper.classify_categories(title, description)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Per-stage benchmark suite for the scraper and populator hot paths
+
+Stages: parse_date_time_location, split_location, convert_time_to_24h, the
+batch normalize_event_lines, classify_categories, match_building vs
+BuildingMatcher over synthetic catalogs (100 to 10k buildings), the end-to-end
+iter_events parse over saved fixture pages, and ingest_events (room
+assignment included, against synthetic bookings) on an in-memory Supabase stub.
+
+Each stage reports throughput (best of --repeat) and the peak memory traced
+by tracemalloc in a separate run. Memoized helpers are cleared before every
+run, so repeats measure cold caches like a fresh process. Stage outputs are hashed and checked against
+benchmarks/golden.json so a faster-but-wrong change fails too.
+
+Usage:
+    python3 benchmarks/bench_pipeline.py [--stage NAME] [--repeat 3]
+    python3 benchmarks/bench_pipeline.py --save results.json
+    python3 benchmarks/bench_pipeline.py --baseline results.json [--tolerance 0.25]
+    python3 benchmarks/bench_pipeline.py --update-golden
+
+Exits 1 if an output differs from the golden digest or a stage is slower than
+the baseline by more than the tolerance.
+"""
+
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+from common import load_script
+from fixtures import CATALOG_SIZES, FIXTURE_SIZES, LOCATIONS, fixture_path, synthetic_bookings, \
+    synthetic_building_catalog, synthetic_event_lines
+from stub_supabase import StubSupabase
+
+scraper = load_script("scrape-connections-events.py")
+populator = load_script("populate-events-database.py")
+
+GOLDEN_FILE = Path(__file__).resolve().parent / 'golden.json'
+
+LINE_COUNT = 5000
+
+INGEST_EVENTS = 500
+
+def clear_caches():
+    for memoized in (scraper._parse_date_time_location, scraper._date_string, scraper.split_location,
+                     scraper.convert_time_range_to_24h, scraper.categories_for_groups,
+                     populator.normalize_building_name):
+        memoized.cache_clear()
+
+def to_json(value):
+    return value.to_dict() if hasattr(value, "to_dict") else str(value)
+
+def digest(outputs):
+    return hashlib.sha256(json.dumps(outputs, sort_keys=True, default=to_json).encode("utf-8")).hexdigest()
+
+def stage_inputs():
+    """Deterministic inputs shared by the per-function stages"""
+    lines = synthetic_event_lines(LINE_COUNT)
+    parsed = [scraper.parse_date_time_location(line, 2025) for _, line, _ in lines]
+    return lines, parsed
+
+def build_stages(selected):
+    """
+    Return [(name, items, run)] where run() processes all items and returns
+    the outputs that are hashed for the golden check
+    """
+    lines, parsed = stage_inputs()
+    stages = [
+        ("parse_date_time_location", len(lines),
+         lambda: [scraper.parse_date_time_location(line, 2025) for _, line, _ in lines]),
+        ("split_location", len(parsed),
+         lambda: [scraper.split_location(location) for _, _, location in parsed]),
+        ("convert_time_to_24h", len(parsed),
+         lambda: [scraper.convert_time_to_24h(time_str) for _, time_str, _ in parsed]),
+        ("normalize_event_lines", len(lines),
+         lambda: [list(fields) for fields in scraper.normalize_event_lines([line for _, line, _ in lines], 2025)]),
+        ("classify_categories", len(lines),
+         lambda: [scraper.classify_categories(title, description) for title, _, description in lines]),
+    ]
+
+    locations = [scraper.split_location(location)[0] for location in LOCATIONS]
+    for size in CATALOG_SIZES:
+        buildings, _ = synthetic_building_catalog(size)
+
+        def legacy(buildings=buildings):
+            outputs = []
+            for location in locations:
+                building, confidence = populator.match_building(location, buildings)
+                outputs.append((location, building and building['name'], round(confidence, 6)))
+            return outputs
+
+        def indexed(buildings=buildings):
+            matcher = populator.BuildingMatcher(buildings)
+            outputs = []
+            for location in locations:
+                building, confidence = matcher.match(location)
+                outputs.append((location, building and building['name'], round(confidence, 6)))
+            return outputs
+
+        stages.append((f"match_building[{size}]", len(locations), legacy))
+        stages.append((f"BuildingMatcher.match[{size}]", len(locations), indexed))
+
+    for size in FIXTURE_SIZES:
+        html = fixture_path(size).read_text(encoding="utf-8")
+        stages.append((f"iter_events[{size}]", size, lambda html=html: list(scraper.iter_events(html))))
+
+    ingest_html = fixture_path(INGEST_EVENTS).read_text(encoding="utf-8")
+    ingest_events = list(scraper.iter_events(ingest_html))
+    ingest_dates = sorted({populator.to_iso_date(event['date']) for event in ingest_events} - {None})
+    for size in CATALOG_SIZES:
+        buildings, rooms = synthetic_building_catalog(size)
+        bookings = synthetic_bookings(rooms, ingest_dates)
+
+        def ingest(buildings=buildings, rooms=rooms, bookings=bookings):
+            client = StubSupabase({"buildings": buildings, "rooms": rooms, "bookings": bookings})
+            random.seed(0)
+            with contextlib.redirect_stdout(io.StringIO()):
+                catalog, rooms_by_building = populator.fetch_catalog(client)
+                populator.ingest_events(client, iter(ingest_events), catalog, rooms_by_building,
+                                        use_match_cache=False, rate_limit=0)
+            rows = [{k: v for k, v in row.items() if k != 'id'} for row in client.tables.get('events', [])]
+            return sorted(rows, key=lambda row: row['event_key'])
+
+        stages.append((f"ingest_events[{INGEST_EVENTS}x{size}]", len(ingest_events), ingest))
+
+    if selected:
+        stages = [stage for stage in stages if any(stage[0].startswith(name) for name in selected)]
+    return stages
+
+def run_stage(run, repeat):
+    """Best wall time over repeat runs, then one traced run for peak memory"""
+    timings = []
+    outputs = None
+    for _ in range(repeat):
+        clear_caches()
+        start = time.perf_counter()
+        outputs = run()
+        timings.append(time.perf_counter() - start)
+
+    clear_caches()
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(timings), peak, outputs
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stage", action="append", default=[],
+                        help="Only run stages whose name starts with this (repeatable)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per stage (best is reported)")
+    parser.add_argument("--save", metavar="PATH", help="Write the results as JSON, for use as a --baseline")
+    parser.add_argument("--baseline", metavar="PATH", help="Compare throughput against saved results")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed throughput drop vs the baseline before failing (0.25 = 25%%)")
+    parser.add_argument("--update-golden", action="store_true",
+                        help="Record the current stage outputs as the expected ones")
+    args = parser.parse_args()
+
+    golden = json.loads(GOLDEN_FILE.read_text()) if GOLDEN_FILE.exists() else {}
+    baseline = json.loads(Path(args.baseline).read_text()) if args.baseline else {}
+
+    print(f"⏱️  Pipeline stages (best of {args.repeat}, peak memory from a traced run)\n")
+    print(f"   {'stage':<34} {'items':>6} {'best time':>10} {'items/s':>10} {'peak mem':>9} {'B/item':>8}  output")
+
+    results = {}
+    failures = []
+    for name, items, run in build_stages(args.stage):
+        best, peak, outputs = run_stage(run, args.repeat)
+        result = {
+            "items": items,
+            "best_s": best,
+            "items_per_s": items / best if best else float("inf"),
+            "peak_bytes": peak,
+            "digest": digest(outputs),
+        }
+        results[name] = result
+
+        if args.update_golden:
+            golden[name] = result["digest"]
+            status = "recorded"
+        elif name not in golden:
+            status = "no golden"
+        elif golden[name] == result["digest"]:
+            status = "✅"
+        else:
+            status = "❌ differs"
+            failures.append(f"{name}: output differs from golden")
+
+        if name in baseline:
+            change = result["items_per_s"] / baseline[name]["items_per_s"] - 1
+            status += f"  {change:+.0%} vs baseline"
+            if change < -args.tolerance:
+                failures.append(f"{name}: {change:+.0%} throughput vs baseline")
+
+        print(f"   {name:<34} {items:>6} {best * 1000:>8.1f}ms {result['items_per_s']:>10.0f} "
+              f"{peak / 1024:>7.0f}KB {peak / max(1, items):>8.0f}  {status}")
+
+    if args.update_golden:
+        GOLDEN_FILE.write_text(json.dumps(golden, indent=2, sort_keys=True) + "\n")
+        print(f"\n💾 Golden digests written to {GOLDEN_FILE.name}")
+
+    if args.save:
+        Path(args.save).write_text(json.dumps(results, indent=2))
+        print(f"\n💾 Results written to {args.save}")
+
+    if failures:
+        print("\n❌ Regressions:")
+        for failure in failures:
+            print(f"   - {failure}")
+        sys.exit(1)
+
+    print("\n✅ No regressions")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Benchmark scraper parsing: original html.parser/get_text implementation vs
+the single-pass iter_events extractor (lxml and html.parser backends)
+
+Each implementation runs in its own subprocess so peak RSS is comparable,
+including memory allocated inside lxml/libxml2.
+
+Usage: python3 benchmarks/bench_scraper_parse.py [--events 5000] [--repeat 3]
+"""
+
+import argparse
+import hashlib
+import json
+import resource
+import subprocess
+import sys
+import time
+
+from bs4 import BeautifulSoup
+
+from common import load_script
+from fixtures import fixture_path
+
+scraper = load_script("scrape-connections-events.py")
+
+def legacy_parse(html, current_year=2025):
+    """scrape_events parsing as it was before iter_events, kept as the baseline"""
+    soup = BeautifulSoup(html, "html.parser")
+    main = soup.find("main") or soup
+    text = main.get_text(separator="\n", strip=True)
+    lines = [line for line in text.split("\n") if line.strip()]
+
+    events = []
+    i = 0
+    while i < len(lines) - 2:
+        line = lines[i].strip()
+
+        if line in scraper.SECTION_TITLES:
+            i += 1
+            continue
+
+        next_line = lines[i + 1].strip()
+
+        if scraper.DATE_LINE_REGEX.match(next_line):
+            desc_line = lines[i + 2].strip() if i + 2 < len(lines) else ""
+            events.append(scraper.build_event(line, next_line, desc_line, current_year))
+            i += 3
+        else:
+            i += 1
+
+    all_links = main.find_all("a")
+    for event in events:
+        matches = []
+        for a in all_links:
+            link_text = a.get_text(strip=True)
+            if link_text and event["title"][:30] in link_text:
+                href = a.get("href")
+                if href and href not in matches:
+                    matches.append(href)
+        event["links"] = matches
+
+    return events
+
+IMPLEMENTATIONS = {
+    "legacy": legacy_parse,
+    "stream-html.parser": lambda html: list(scraper.iter_events(html, parser="html.parser")),
+    "stream-lxml": lambda html: list(scraper.iter_events(html, parser="lxml")),
+}
+
+def run_one(name, path, repeat):
+    """Child process: time one implementation and report peak RSS growth as JSON"""
+    html = path.read_text(encoding="utf-8")
+    baseline_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    timings = []
+    events = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        events = IMPLEMENTATIONS[name](html)
+        timings.append(time.perf_counter() - start)
+
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({
+        "events": len(events),
+        "best_s": min(timings),
+        "peak_rss_mb": (peak_kb - baseline_kb) / 1024,
+        "digest": hashlib.sha256(json.dumps([event.to_dict() for event in events], sort_keys=True)
+                                 .encode("utf-8")).hexdigest(),
+    }))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=5000, help="Events on the fixture page")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per implementation (best is reported)")
+    parser.add_argument("--run", choices=IMPLEMENTATIONS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    path = fixture_path(args.events)
+    if args.run:
+        run_one(args.run, path, args.repeat)
+        return
+
+    print(f"📄 Fixture: {path.name} ({path.stat().st_size / 1024:.0f} KB, {args.events} events)\n")
+    print(f"   {'implementation':<20} {'events':>7} {'best time':>10} {'peak RSS':>10}")
+
+    results = {}
+    for name in IMPLEMENTATIONS:
+        if name == "stream-lxml" and not scraper.HAS_LXML:
+            print(f"   {name:<20} skipped (lxml not installed)")
+            continue
+        out = subprocess.run(
+            [sys.executable, __file__, "--events", str(args.events), "--repeat", str(args.repeat), "--run", name],
+            capture_output=True, text=True, check=True,
+        )
+        results[name] = json.loads(out.stdout.strip().splitlines()[-1])
+        r = results[name]
+        print(f"   {name:<20} {r['events']:>7} {r['best_s'] * 1000:>8.0f}ms {r['peak_rss_mb']:>8.1f}MB")
+
+    digests = {r["digest"] for r in results.values()}
+    print("\n✅ All implementations produced identical events" if len(digests) == 1
+          else "\n❌ Implementations disagree on the extracted events")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+"""
+Shared helpers for the scraper/populator benchmarks
+The pipeline scripts have hyphenated file names, so they are loaded by path
+"""
+
+import importlib.util
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# The scripts import sibling modules such as run_metrics
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+FIXTURES_DIR = Path(__file__).resolve().parent / 'fixtures'
+
+def load_script(filename, module_name=None):
+    """Import a top-level script such as scrape-connections-events.py as a module"""
+    module_name = module_name or Path(filename).stem.replace('-', '_')
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+
+    spec = importlib.util.spec_from_file_location(module_name, REPO_ROOT / filename)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
@@ -0,0 +1,206 @@
+"""
+Synthetic UVA Connections newsletter pages and building catalogs for benchmarks
+Pages follow the live layout: section headings, then per event a linked title,
+a "Nov. 16, 12 p.m., Newcomb Hall Ballroom" line and a description paragraph,
+surrounded by navigation, scripts and footer links. Catalogs mimic the
+buildings/rooms tables. Output is deterministic for a given size and seed.
+"""
+
+import random
+
+from common import FIXTURES_DIR
+
+SECTIONS = ["ENGAGE", "LEARN", "BE WELL", "ARTS", "TALKS"]
+
+MONTHS = ["Jan.", "Feb.", "Mar.", "Apr.", "May", "Jun.", "Jul.", "Aug.", "Sept.", "Oct.", "Nov.", "Dec."]
+
+TIMES = ["12 p.m.", "6 – 8:30 p.m.", "10 a.m.", "7:30 p.m.", "4 – 5 p.m.", "9 a.m. – 3 p.m.", "noon"]
+
+LOCATIONS = [
+    "Newcomb Hall Ballroom", "Old Cabell Hall", "1515 University Ave.", "Gibson 141",
+    "Rice Hall 130", "Clemons Library Room 201", "Shannon Library", "The Rotunda Dome Room",
+    "Chemistry Building 402", "Culbreth Theatre", "JPJ", "Scott Stadium", "Zoom",
+    "Nau Hall 101", "Brown Lib", "O'Hill", "Runk Dining Hall", "Thornton Hall E316",
+]
+
+TITLE_WORDS = [
+    "Study Break", "Showcase", "Concert", "Workshop", "Career Fair", "5K Run", "Social",
+    "Movie Night", "Game Night", "Mixer", "Info Session", "Open Mic", "Tournament",
+    "Dance Performance", "Panel", "Lecture", "Yoga", "Hackathon", "Bagel Breakfast",
+]
+
+FIXTURE_SIZES = [50, 500, 5000]
+
+CATALOG_SIZES = [100, 1000, 10000]
+
+# Buildings the synthetic pages refer to, always present in a catalog
+SEED_BUILDINGS = [
+    "Newcomb Hall", "Old Cabell Hall", "Gibson Hall", "Rice Hall", "Clemons Library",
+    "Shannon Library", "The Rotunda", "Chemistry Building", "Culbreth Theatre",
+    "John Paul Jones Arena", "Scott Stadium", "Nau Hall", "Brown Library",
+    "Observatory Hill Dining Hall", "Runk Dining Hall", "Thornton Hall",
+]
+
+BUILDING_STEMS = [
+    "Alderman", "Bryan", "Cocke", "Dawson", "Garrett", "Kerchof", "Maury", "Minor", "Monroe",
+    "Pavilion", "Randall", "Ruffner", "Shea", "Wilson", "Hereford", "Gooch", "Dillard", "Kellogg",
+    "Lambeth", "Bond", "Cabell", "Jordan", "Mead", "Stacey", "Page", "Hancock", "Emmet", "Ivy",
+]
+
+BUILDING_SUFFIXES = ["Hall", "House", "Library", "Center", "Building", "Annex", "Pavilion", "Commons"]
+
+BUILDING_CATEGORIES = ["Academic", "Library", "Dining", "Housing", "Athletics", "Arts", "Student Life"]
+
+# 0 is how the rooms table records an unknown capacity
+ROOM_CAPACITIES = [0, 8, 12, 20, 30, 45, 80, 150]
+
+ORGS = [
+    "Women in Tech @ UVA", "Hoos Cooking at UVA", "Student Council", "UVA Dance Association",
+    "Madison House", "Black Student Alliance", "Outdoors Club", "Hindu Student Council",
+]
+
+DESCRIPTIONS = [
+    "Join {org} for free pizza and snacks provided while supplies last. Bring a friend",
+    "An evening of music and a cappella performances. Tickets are free for students",
+    "Meet recruiters from dozens of employers. Business casual attire encouraged",
+    "Run the annual race around Grounds to support local charities. Registration required",
+    "Hosted by {org}. Light refreshments and lunch will be served",
+    "A talk on research, policy and the future of higher education, followed by Q&A",
+    "Unwind with games, crafts and therapy dogs before finals. No cost to attend",
+]
+
+def synthetic_event_lines(count, seed=0):
+    """(title, date/time/location line, description) triples as they appear on a page"""
+    rng = random.Random(seed)
+    lines = []
+    for n in range(count):
+        org = rng.choice(ORGS)
+        month = rng.choice(MONTHS)
+        day = rng.randint(1, 28)
+        date_part = f"{month} {day}" if rng.random() > 0.1 else f"{month} {day}–{day + 1}"
+        lines.append((
+            f"{org} {rng.choice(TITLE_WORDS)}",
+            f"{date_part}, {rng.choice(TIMES)}, {rng.choice(LOCATIONS)}",
+            rng.choice(DESCRIPTIONS).format(org=org),
+        ))
+    return lines
+
+def synthetic_connections_page(event_count, seed=0):
+    """Return the HTML of a Connections-style page with event_count events"""
+    rng = random.Random(seed)
+    parts = [
+        "<!DOCTYPE html><html><head><title>Connections | Student Affairs</title>",
+        "<script>window.dataLayer = window.dataLayer || [];</script>",
+        "<style>main { max-width: 60rem; }</style></head><body>",
+        "<nav><ul>",
+    ]
+    for i in range(40):
+        parts.append(f'<li><a href="/nav/{i}">Navigation item {i}</a></li>')
+    parts.append("</ul></nav><main>")
+    parts.append("<h1>Connections</h1><p>Your weekly guide to what's happening on Grounds.</p>")
+
+    per_section = max(1, event_count // len(SECTIONS))
+    for n in range(event_count):
+        if n % per_section == 0:
+            parts.append(f'<h2 id="section-{n}">{SECTIONS[(n // per_section) % len(SECTIONS)]}</h2>')
+
+        org = rng.choice(ORGS)
+        title = f"{org.split(' @ ')[0].split(' at ')[0]} {rng.choice(TITLE_WORDS)} #{n}"
+        month = rng.choice(MONTHS)
+        day = rng.randint(1, 28)
+        date_part = f"{month} {day}" if rng.random() > 0.1 else f"{month} {day}–{day + 1}"
+        line = f"{date_part}, {rng.choice(TIMES)}, {rng.choice(LOCATIONS)}"
+        description = rng.choice(DESCRIPTIONS).format(org=org)
+
+        parts.append('<div class="event">')
+        parts.append(f'<h3><a href="https://example.org/events/{n}">{title}</a></h3>')
+        parts.append(f"<p><strong>{line}</strong></p>")
+        parts.append(f"<p>{description}.</p>")
+        if rng.random() < 0.3:
+            parts.append(f'<p><a href="https://instagram.com/org{n}">{title} on Instagram</a></p>')
+        if rng.random() < 0.2:
+            parts.append(f'<p><a href="https://doorlist.app/e/{n}">RSVP for {title}</a></p>')
+        if rng.random() < 0.05:
+            parts.append("<!-- editor note: confirm room -->")
+        parts.append("</div>")
+
+    parts.append("</main><footer>")
+    for i in range(60):
+        parts.append(f'<a href="/footer/{i}">Footer link {i}</a>')
+    parts.append("</footer></body></html>")
+    return "\n".join(parts)
+
+def synthetic_building_catalog(building_count, seed=0, rooms_per_building=(0, 12)):
+    """
+    Return (buildings, rooms) rows shaped like the buildings and rooms tables
+    The buildings the synthetic pages mention come first; the rest are unique
+    generated names spread around Grounds
+    """
+    rng = random.Random(seed)
+    names = list(SEED_BUILDINGS[:building_count])
+    seen = set(names)
+    n = 0
+    while len(names) < building_count:
+        n += 1
+        name = f"{rng.choice(BUILDING_STEMS)} {rng.choice(BUILDING_SUFFIXES)}"
+        if name in seen:
+            name = f"{name} {n}"
+        seen.add(name)
+        names.append(name)
+
+    buildings = []
+    rooms = []
+    for building_id, name in enumerate(names, start=1):
+        buildings.append({
+            "id": building_id,
+            "name": name,
+            "category": rng.choice(BUILDING_CATEGORIES),
+            "latitude": round(38.03 + rng.uniform(-0.015, 0.015), 6),
+            "longitude": round(-78.505 + rng.uniform(-0.02, 0.02), 6),
+            "updated_at": "2025-11-01T00:00:00+00:00",
+        })
+        for _ in range(rng.randint(*rooms_per_building)):
+            # Capacity and availability cycle with the room id so the rng
+            # sequence (and every building name) stays the same
+            rooms.append({
+                "id": len(rooms) + 1,
+                "building_id": building_id,
+                "room_name": f"Room {rng.randint(100, 499)}",
+                "capacity": ROOM_CAPACITIES[len(rooms) % len(ROOM_CAPACITIES)],
+                "available": len(rooms) % 10 != 9,
+            })
+    return buildings, rooms
+
+def synthetic_bookings(rooms, iso_dates, seed=0, booked_share=0.3):
+    """
+    Confirmed bookings rows: about booked_share of the rooms in the buildings
+    the synthetic pages mention get one slot per date
+    """
+    rng = random.Random(seed)
+    bookings = []
+    for room in rooms:
+        if room["building_id"] > len(SEED_BUILDINGS):
+            continue
+        for iso_date in iso_dates:
+            if rng.random() >= booked_share:
+                continue
+            start = rng.randint(9, 20) * 60 + rng.choice([0, 30])
+            end = start + rng.choice([60, 90, 120])
+            bookings.append({
+                "id": len(bookings) + 1,
+                "room_id": room["id"],
+                "building_id": room["building_id"],
+                "booking_date": iso_date,
+                "start_time": f"{start // 60:02d}:{start % 60:02d}:00",
+                "end_time": f"{min(end, 1439) // 60:02d}:{min(end, 1439) % 60:02d}:00",
+                "status": "confirmed",
+            })
+    return bookings
+
+def fixture_path(event_count, seed=0):
+    """Path of the saved fixture page, generating it on first use"""
+    FIXTURES_DIR.mkdir(exist_ok=True)
+    path = FIXTURES_DIR / f"connections_{event_count}.html"
+    if not path.exists():
+        path.write_text(synthetic_connections_page(event_count, seed), encoding="utf-8")
+    return path
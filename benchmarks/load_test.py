@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Load test for the scrape → match → write pipeline against a local PostgREST stand-in
+
+Serves a synthetic Connections page with --events events, plus a synthetic
+building catalog and bookings, from postgrest_standin.PostgrestStandin. The
+pipeline then runs through the real supabase-py client: it fetches and parses
+the page, then ingest_events matches every event, assigns rooms and writes
+it through the populator's EventWriter. The stand-in injects latency, jitter
+and 503/429 responses on writes, so retries and backoff are exercised without
+touching the real project. Like a hosted project it returns at most
+--max-rows rows per read and applies the migrations' row-level security to
+the anon key: reads see only scraped events, and --anon-updates sets which
+rows it may update. The location match cache is not used, so the synthetic
+catalog never replaces the populator's own cache file.
+
+Each run reports:
+- end-to-end throughput and per-stage wall time;
+- write request latency as the writer saw it: p50/p95/p99/max, with every
+  retry attempt counted;
+- what the stand-in served.
+
+--runs 2 repeats the pipeline against the same tables. On the second run
+every event is unchanged, so the dedup path is measured.
+
+Usage:
+    python3 benchmarks/load_test.py [--events 10000] [--catalog-size 1000]
+    python3 benchmarks/load_test.py --latency 40 --jitter 20 --error-rate 0.02 --throttle-rate 0.05
+    python3 benchmarks/load_test.py --workers 8 --chunk-size 250 --rate-limit 0 --save load.json
+
+Exits 1 if any event could not be written.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import date, timedelta
+from pathlib import Path
+
+from common import load_script
+from fixtures import synthetic_bookings, synthetic_building_catalog, synthetic_connections_page
+from postgrest_standin import ANON_UPDATE_POLICIES, MAX_ROWS, PostgrestStandin
+
+import run_metrics
+
+scraper = load_script("scrape-connections-events.py")
+populator = load_script("populate-events-database.py")
+
+PAGE_PATH = "/connections"
+
+ANON_KEY = "load-test-anon-key"
+
+# The synthetic pages use the scraper's default year
+PAGE_YEAR = 2025
+
+def page_dates(year=PAGE_YEAR):
+    day = date(year, 1, 1)
+    dates = []
+    while day.year == year:
+        dates.append(day.isoformat())
+        day += timedelta(days=1)
+    return dates
+
+def run_once(client, url, args, session, cache_file):
+    """One pipeline run; returns (seconds, scraped events, match stats, write result)"""
+    run_metrics.reset()
+    start = time.perf_counter()
+    with run_metrics.stage("fetch"):
+        html, _, _ = scraper.fetch_page(url, scraper.REQUEST_HEADERS, cache_file=cache_file, force=True,
+                                     session=session)
+    with run_metrics.stage("parse"):
+        events = list(scraper.iter_events(html, parser=args.parser))
+
+    output = io.StringIO()
+    with contextlib.redirect_stdout(sys.stdout if args.verbose else output):
+        with run_metrics.stage("catalog"):
+            buildings, rooms_by_building = populator.fetch_catalog(client)
+        match_stats, write_result = populator.ingest_events(
+            client, iter(events), buildings, rooms_by_building, args.chunk_size,
+            workers=args.workers, rate_limit=args.rate_limit, use_match_cache=False,
+        )
+    return time.perf_counter() - start, len(events), match_stats, write_result
+
+def latency_summary(latencies):
+    """p50/p95/p99/max in milliseconds"""
+    return {
+        name: round(populator.percentile(latencies, pct) * 1000, 1)
+        for name, pct in (("p50", 50), ("p95", 95), ("p99", 99), ("max", 100))
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=10000, help="Events on the synthetic page")
+    parser.add_argument("--catalog-size", type=int, default=1000, help="Buildings in the synthetic catalog")
+    parser.add_argument("--latency", type=float, default=20.0, help="Stand-in latency per request in ms")
+    parser.add_argument("--jitter", type=float, default=10.0, help="Mean extra exponential latency in ms")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of writes answered with 503")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Share of writes answered with 429")
+    parser.add_argument("--chunk-size", type=int, default=populator.INSERT_CHUNK_SIZE,
+                        help="Events per write request")
+    parser.add_argument("--workers", type=int, default=populator.WRITER_WORKERS,
+                        help="Concurrent write requests")
+    parser.add_argument("--rate-limit", type=float, default=0,
+                        help="Max write requests per second (0 = unlimited, the default here)")
+    parser.add_argument("--max-rows", type=int, default=MAX_ROWS,
+                        help="Rows the stand-in returns per read at most (0 = no cap)")
+    parser.add_argument("--anon-updates", choices=sorted(ANON_UPDATE_POLICIES), default="system",
+                        help="Which rows the anon key may update: scraped rows only, none, or all")
+    parser.add_argument("--runs", type=int, default=1, help="Pipeline runs against the same tables")
+    parser.add_argument("--parser", choices=scraper.PARSER_CHOICES, default="auto", help="HTML parser backend")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the page, catalog and injected faults")
+    parser.add_argument("--save", metavar="PATH", help="Write the results as JSON")
+    parser.add_argument("--verbose", action="store_true", help="Show the populator's own output")
+    args = parser.parse_args()
+
+    buildings, rooms = synthetic_building_catalog(args.catalog_size, seed=args.seed)
+    bookings = synthetic_bookings(rooms, page_dates(), seed=args.seed)
+    standin = PostgrestStandin(
+        {"buildings": buildings, "rooms": rooms, "bookings": bookings},
+        latency=args.latency / 1000, jitter=args.jitter / 1000, error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate, seed=args.seed, max_rows=args.max_rows or None,
+        anon_updates=args.anon_updates,
+    )
+    standin.add_page(PAGE_PATH, synthetic_connections_page(args.events, seed=args.seed))
+
+    print(f"🏋️  Load test: {args.events} events, {len(buildings)} buildings, {len(rooms)} rooms, "
+          f"{len(bookings)} bookings")
+    print(f"   Stand-in: {args.latency:g} ms + ~{args.jitter:g} ms jitter, "
+          f"{args.error_rate:.0%} 503s and {args.throttle_rate:.0%} 429s on writes, "
+          f"{args.max_rows or 'no'} max rows, anon updates: {args.anon_updates}")
+    print(f"   Writer: {args.workers} workers, {args.chunk_size} events per request, "
+          f"rate limit {args.rate_limit or 'off'}\n")
+
+    results = []
+    failed = False
+    with standin, tempfile.TemporaryDirectory() as tmp, scraper.requests.Session() as session:
+        client = populator.create_client(standin.url, ANON_KEY)
+        cache_file = Path(tmp) / "page_cache.json"
+        for run in range(1, args.runs + 1):
+            served_before = Counter(standin.responses)
+            seconds, scraped, match_stats, write_result = run_once(
+                client, standin.url + PAGE_PATH, args, session, cache_file)
+            served = Counter(standin.responses)
+            served.subtract(served_before)
+            statuses = Counter()
+            for (_, _, status), n in served.items():
+                if n:
+                    statuses[status] += n
+
+            stages = run_metrics.report()["stages"]
+            result = {
+                "run": run,
+                "events": scraped,
+                "seconds": round(seconds, 3),
+                "events_per_s": round(scraped / seconds, 1) if seconds else 0.0,
+                "written": write_result["inserted"],
+                "unchanged": match_stats["unchanged"],
+                "write_errors": write_result["errors"],
+                "write_requests": write_result["requests"],
+                "write_retries": write_result["retries"],
+                "write_latency_ms": latency_summary(write_result["request_latencies"]),
+                "stage_s": {name: data["wall_s"] for name, data in stages.items()},
+                "responses": {str(status): n for status, n in sorted(statuses.items())},
+                "rows": len(standin.tables.get("events", [])),
+            }
+            results.append(result)
+            failed = failed or bool(write_result["errors"])
+
+            latency = result["write_latency_ms"]
+            print(f"📊 Run {run}: {scraped} events in {seconds:.2f}s ({result['events_per_s']:.0f} events/s)")
+            print(f"   Written: {result['written']}, unchanged: {result['unchanged']}, "
+                  f"errors: {result['write_errors']}, rows in events: {result['rows']}")
+            print(f"   Write requests: {result['write_requests']} ({result['write_retries']} retried), "
+                  f"latency p50 {latency['p50']:.0f} ms, p95 {latency['p95']:.0f} ms, "
+                  f"p99 {latency['p99']:.0f} ms, max {latency['max']:.0f} ms")
+            print("   Stages: " + ", ".join(f"{name} {wall:.2f}s" for name, wall in result["stage_s"].items()))
+            print("   Stand-in responses: " + ", ".join(f"{status}: {n}" for status, n in result["responses"].items())
+                  + "\n")
+
+    if args.save:
+        Path(args.save).write_text(json.dumps({"options": vars(args), "runs": results}, indent=2))
+        print(f"💾 Results written to {args.save}")
+
+    if failed:
+        print("❌ Some events could not be written")
+        sys.exit(1)
+    print("✅ Every event was written")
+
+if __name__ == "__main__":
+    main()
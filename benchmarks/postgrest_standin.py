@@ -0,0 +1,371 @@
+"""
+Local HTTP stand-in for the part of Supabase's REST API (PostgREST) that the
+populator uses, for load-testing without touching the real project
+
+Serves three kinds of request under /rest/v1/<table>:
+- GET: select, with eq/neq/gt/gte/lt/lte/in/is filters, order, limit and
+  Prefer: count=exact.
+- POST: insert, or an upsert when on_conflict and
+  Prefer: resolution=merge-duplicates are given.
+- PATCH: update.
+
+It also serves /rest/v1/rpc/<name> (with limit and offset) for the functions in
+stub_supabase.FUNCTIONS. Rows live in a StubSupabase, so the stand-in and the
+in-memory stub give the same results. Date columns are stored as ISO dates,
+as Postgres would. eq and in filters on the stub's INDEXED_COLUMNS (id,
+event_key) are answered from an index rather than a table scan.
+
+Two limits of a hosted project are modelled, so code that ignores them fails
+here rather than in production:
+- max_rows (1000, Supabase's default): a GET or rpc returns at most that many
+  rows, whatever limit it asked for, and Content-Range shows the total.
+- Row-level security, for requests not made with service_key. Reads follow
+  the migrations' SELECT policies (ANON_READ_POLICIES): anon sees scraped
+  events only (created_by is the system user and event_key is set), no
+  bookings and no snapshots; buildings and rooms are public. As in Postgres,
+  a PATCH or upsert only reaches rows the request can read. Updates also
+  follow anon_updates: "system" (the default) mirrors the events UPDATE
+  policy, "none" rejects every anon update, "all" allows any visible row.
+  A PATCH skips rows it may not update; an upsert that conflicts with one
+  fails with 401 and code 42501, as PostgREST answers an anon request.
+  rpc calls run as their SECURITY DEFINER functions do, without these checks.
+
+Each request waits latency seconds plus an exponential jitter. Writes can be
+failed at random with 503 (a retryable PostgREST connection error) or with
+429 (rate limited, with Retry-After). Reads are never failed, so a run always
+gets its catalog. Pages registered with add_page() are served as HTML, so the
+scraper can fetch a synthetic newsletter from the same server.
+"""
+
+import json
+import random
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+from stub_supabase import StubSupabase
+
+REST_PREFIX = "/rest/v1/"
+
+# Query parameters that are not column filters
+RESERVED_PARAMS = {"select", "order", "limit", "offset", "on_conflict", "columns"}
+
+# Columns Postgres stores as date: written as MM/DD/YYYY or ISO, read back as ISO
+DATE_COLUMNS = {"events": ("event_date",)}
+
+# Supabase's default db-max-rows
+MAX_ROWS = 1000
+
+SYSTEM_USER_ID = "00000000-0000-0000-0000-000000000000"
+
+def is_scraped_row(row):
+    """The rows the events policies open to anon: system events with an event_key"""
+    return row.get("created_by") == SYSTEM_USER_ID and row.get("event_key") is not None
+
+# Rows an anon request can read, per table (tables not listed are public)
+ANON_READ_POLICIES = {
+    "events": is_scraped_row,
+    "bookings": lambda row: False,
+    "building_event_snapshots": lambda row: False,
+}
+
+# anon_updates modes: which existing rows an anon request may update
+ANON_UPDATE_POLICIES = {
+    "system": is_scraped_row,
+    "none": lambda row: False,
+    "all": None,
+}
+
+def _text(value):
+    """A row value as PostgREST compares it against a filter argument"""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+def _coerce(text, sample):
+    """Filter argument converted to the type of the row value it is compared with"""
+    if isinstance(sample, bool):
+        return text == "true"
+    try:
+        if isinstance(sample, int):
+            return int(text)
+        if isinstance(sample, float):
+            return float(text)
+    except ValueError:
+        pass
+    return text
+
+def parse_in_list(text):
+    """Values of an in.(a,"b, c") filter"""
+    body = text[1:-1] if text.startswith("(") and text.endswith(")") else text
+    values = []
+    i = 0
+    while i <= len(body):
+        if body[i:i + 1] == '"':
+            # A quoted value runs to the quote that ends the list or precedes a comma
+            end = i + 1
+            while end < len(body) and not (body[end] == '"' and body[end + 1:end + 2] in ("", ",")):
+                end += 1
+            values.append(body[i + 1:end])
+            i = end + 2
+        else:
+            end = body.find(",", i)
+            end = len(body) if end == -1 else end
+            values.append(body[i:end])
+            i = end + 1
+    return values
+
+def parse_filter(column, expression):
+    """Row predicate for a PostgREST filter such as gt.5, in.(a,b) or is.null"""
+    op, _, arg = expression.partition(".")
+    if op == "in":
+        values = set(parse_in_list(arg))
+        return lambda row: row.get(column) is not None and _text(row[column]) in values
+    if op == "is":
+        expected = {"null": None, "true": True, "false": False}[arg]
+        return lambda row: row.get(column) is expected
+    if op == "eq":
+        return lambda row: row.get(column) is not None and _text(row[column]) == arg
+    if op == "neq":
+        return lambda row: row.get(column) is not None and _text(row[column]) != arg
+
+    compare = {
+        "gt": lambda a, b: a > b,
+        "gte": lambda a, b: a >= b,
+        "lt": lambda a, b: a < b,
+        "lte": lambda a, b: a <= b,
+    }[op]
+    return lambda row: row.get(column) is not None and compare(row[column], _coerce(arg, row[column]))
+
+def to_iso_date(value):
+    if isinstance(value, str) and "/" in value:
+        try:
+            return datetime.strptime(value, "%m/%d/%Y").date().isoformat()
+        except ValueError:
+            return value
+    return value
+
+class PostgrestStandin:
+    """
+    Threaded HTTP server over a StubSupabase
+    tables: {"buildings": [...], "rooms": [...], ...} to start from
+    latency and jitter are in seconds; error_rate and throttle_rate are the
+    share of write requests answered with 503 and 429
+    max_rows caps rows per read (None for no cap); anon_updates is a key of
+    ANON_UPDATE_POLICIES; requests with service_key bypass row-level security
+    """
+
+    def __init__(self, tables=None, latency=0.0, jitter=0.0, error_rate=0.0, throttle_rate=0.0, seed=0,
+                 host="127.0.0.1", port=0, max_rows=MAX_ROWS, anon_updates="system", service_key=None):
+        self.client = StubSupabase(tables)
+        self.max_rows = max_rows
+        self.update_policy = ANON_UPDATE_POLICIES[anon_updates]
+        self.service_key = service_key
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.rng = random.Random(seed)
+        self.pages = {}
+        self.responses = Counter()
+        self.service_times = []
+        self.lock = threading.Lock()
+
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def tables(self):
+        return self.client.tables
+
+    def add_page(self, path, html):
+        """Serve html at path (e.g. "/connections")"""
+        self.pages[path] = html.encode("utf-8")
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _delay(self):
+        with self.lock:
+            delay = self.latency + (self.rng.expovariate(1 / self.jitter) if self.jitter else 0.0)
+            roll = self.rng.random()
+        return delay, roll
+
+    def _record(self, method, target, status, seconds):
+        with self.lock:
+            self.responses[(method, target, status)] += 1
+            self.service_times.append(seconds)
+
+    def _handler_class(self):
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # Keep-alive, like PostgREST behind the Supabase gateway
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                self._handle()
+
+            def do_POST(self):
+                self._handle()
+
+            def do_PATCH(self):
+                self._handle()
+
+            def _send(self, status, body=b"", content_type="application/json", headers=None):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _send_json(self, status, data, headers=None):
+                self._send(status, json.dumps(data, default=str).encode("utf-8"), headers=headers)
+
+            def _send_error(self, status, code, message, headers=None):
+                self._send_json(status, {"code": code, "message": message, "details": None, "hint": None},
+                                headers)
+
+            def _handle(self):
+                started = time.perf_counter()
+                parts = urlsplit(self.path)
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+
+                if not parts.path.startswith(REST_PREFIX):
+                    page = standin.pages.get(parts.path)
+                    if self.command == "GET" and page is not None:
+                        self._send(200, page, "text/html; charset=utf-8")
+                        status = 200
+                    else:
+                        self._send(404, b"Not Found", "text/plain")
+                        status = 404
+                    standin._record(self.command, "page", status, time.perf_counter() - started)
+                    return
+
+                target = parts.path[len(REST_PREFIX):]
+                delay, roll = standin._delay()
+                time.sleep(delay)
+
+                is_write = self.command != "GET" and not target.startswith("rpc/")
+                if is_write and roll < standin.throttle_rate:
+                    status = 429
+                    self._send_error(429, "429", "Too Many Requests", {"Retry-After": "1"})
+                elif is_write and roll < standin.throttle_rate + standin.error_rate:
+                    status = 503
+                    self._send_error(503, "PGRST001", "Database client error. Retrying the connection.")
+                else:
+                    try:
+                        status = self._respond(target, parse_qsl(parts.query, keep_blank_values=True), body)
+                    except PermissionError as e:
+                        status = 401
+                        self._send_error(401, "42501", str(e))
+                    except Exception as e:
+                        status = 500
+                        self._send_error(500, "XX000", str(e))
+                standin._record(self.command, target, status, time.perf_counter() - started)
+
+            def _respond(self, target, params, body):
+                prefer = self.headers.get("Prefer", "")
+                payload = json.loads(body) if body else None
+
+                if target.startswith("rpc/"):
+                    rpc = standin.client.rpc(target[4:], payload or {})
+                    args = dict(params)
+                    if "limit" in args:
+                        offset = int(args.get("offset", 0))
+                        rpc.range(offset, offset + int(args["limit"]) - 1)
+                    try:
+                        response = rpc.execute()
+                    except RuntimeError as e:
+                        self._send_error(404, "PGRST202", str(e))
+                        return 404
+                    rows = response.data
+                    if isinstance(rows, list) and standin.max_rows is not None:
+                        rows = rows[:standin.max_rows]
+                    self._send_json(200, rows)
+                    return 200
+
+                query = standin.client.table(target)
+                args = dict(params)
+                if self.command == "GET":
+                    query.select(args.get("select", "*"), count="exact" if "count=exact" in prefer else None)
+                    if "order" in args:
+                        column, _, direction = args["order"].split(",")[0].partition(".")
+                        query.order(column, desc=direction.startswith("desc"))
+                    if "limit" in args:
+                        query.limit(int(args["limit"]))
+                elif self.command == "POST":
+                    rows = [self._normalize(target, row) for row in
+                            (payload if isinstance(payload, list) else [payload])]
+                    if args.get("on_conflict") and "resolution=merge-duplicates" in prefer:
+                        query.upsert(rows, on_conflict=args["on_conflict"])
+                    else:
+                        query.insert(rows)
+                else:
+                    query.update(self._normalize(target, payload))
+
+                if not self._is_service_role():
+                    query.restrict_reads(ANON_READ_POLICIES.get(target))
+                    if self.command != "GET":
+                        query.restrict_updates(standin.update_policy)
+                for column, expression in params:
+                    if column in RESERVED_PARAMS:
+                        continue
+                    query.filters.append(parse_filter(column, expression))
+                    op, _, arg = expression.partition(".")
+                    if op in ("eq", "in"):
+                        query.within(column, parse_in_list(arg) if op == "in" else [arg])
+                response = query.execute()
+
+                status = 201 if self.command == "POST" else 200
+                headers = {}
+                if self.command == "GET":
+                    if standin.max_rows is not None:
+                        response.data = response.data[:standin.max_rows]
+                    last = len(response.data) - 1
+                    total = "*" if response.count is None else response.count
+                    headers["Content-Range"] = f"0-{last}/{total}" if response.data else f"*/{total}"
+                if self.command != "GET" and "return=representation" not in prefer:
+                    self._send(204 if status == 200 else status, headers=headers)
+                    return status
+                self._send_json(status, response.data, headers)
+                return status
+
+            def _is_service_role(self):
+                key = standin.service_key
+                return key is not None and self.headers.get("Authorization") == f"Bearer {key}"
+
+            def _normalize(self, table, row):
+                for column in DATE_COLUMNS.get(table, ()):
+                    if column in row:
+                        row[column] = to_iso_date(row[column])
+                return row
+
+        return Handler
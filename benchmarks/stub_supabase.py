@@ -0,0 +1,305 @@
+"""
+In-memory stand-in for the supabase-py client, for benchmarking the populator
+without a network or a database
+
+Supports the query builder calls populate-events-database.py makes: select
+(with count="exact"), eq/gt/gte/lte/in_/is_ filters, order, limit, insert, upsert (on_conflict),
+update, and rpc for the database functions in FUNCTIONS. An optional
+per-request latency approximates a PostgREST round trip.
+
+eq/in_ filters on INDEXED_COLUMNS, and upserts, look rows up in a per-column
+index instead of scanning the table, like the unique indexes behind them, so
+lookups by key stay cheap as tables grow. The index follows writes made
+through the client; rows edited directly in tables are not re-indexed.
+"""
+
+import threading
+import time
+
+# Unique columns that eq/in_ filters look up by index
+INDEXED_COLUMNS = {"id", "event_key"}
+
+class StubResponse:
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+class StubQuery:
+    def __init__(self, client, table):
+        self.client = client
+        self.table = table
+        self.action = "select"
+        self.payload = None
+        self.on_conflict = None
+        self.columns = None
+        self.count = None
+        self.filters = []
+        self.lookup = None
+        self.read_policy = None
+        self.update_policy = None
+        self.order_by = None
+        self.row_limit = None
+
+    def select(self, columns="*", count=None, **_):
+        self.action = "select"
+        self.count = count
+        self.columns = None if columns.strip() == "*" else [c.strip() for c in columns.split(",")]
+        return self
+
+    def insert(self, rows, **_):
+        self.action = "insert"
+        self.payload = rows if isinstance(rows, list) else [rows]
+        return self
+
+    def upsert(self, rows, on_conflict=None, **_):
+        self.action = "upsert"
+        self.payload = rows if isinstance(rows, list) else [rows]
+        self.on_conflict = on_conflict
+        return self
+
+    def update(self, values, **_):
+        self.action = "update"
+        self.payload = values
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(lambda row: row.get(column) == value)
+        return self.within(column, [value])
+
+    def gt(self, column, value):
+        self.filters.append(lambda row: row.get(column) is not None and row[column] > value)
+        return self
+
+    def gte(self, column, value):
+        self.filters.append(lambda row: row.get(column) is not None and row[column] >= value)
+        return self
+
+    def lte(self, column, value):
+        self.filters.append(lambda row: row.get(column) is not None and row[column] <= value)
+        return self
+
+    def in_(self, column, values):
+        values = set(values)
+        self.filters.append(lambda row: row.get(column) in values)
+        return self.within(column, values)
+
+    def is_(self, column, value):
+        expected = None if value in (None, "null") else value
+        self.filters.append(lambda row: row.get(column) is expected)
+        return self
+
+    def order(self, column, desc=False, **_):
+        self.order_by = (column, desc)
+        return self
+
+    def limit(self, count):
+        self.row_limit = count
+        return self
+
+    def within(self, column, values):
+        """
+        Only consider rows whose column is one of values, found by index when
+        column is in INDEXED_COLUMNS; a narrowing only, so filters still apply
+        """
+        if column in INDEXED_COLUMNS:
+            keys = {str(value) for value in values if value is not None}
+            if self.lookup is not None and self.lookup[0] == column:
+                keys &= self.lookup[1]
+            self.lookup = (column, keys)
+        return self
+
+    def restrict_reads(self, policy):
+        """
+        Row-level security for reads: only rows where policy(row) is true are
+        visible, to selects and, as in Postgres, to updates and upsert conflicts
+        """
+        self.read_policy = policy
+        return self
+
+    def restrict_updates(self, policy):
+        """
+        Row-level security for updates: only existing rows where policy(row) is
+        true can be updated, and an updated row must still satisfy it. An update
+        skips other rows; an upsert that conflicts with one raises PermissionError
+        """
+        self.update_policy = policy
+        return self
+
+    def _matches(self, row):
+        return all(f(row) for f in self.filters)
+
+    def _visible(self, row):
+        return self.read_policy is None or self.read_policy(row)
+
+    def execute(self):
+        return self.client._execute(self)
+
+class StubRpc:
+    def __init__(self, client, name, params):
+        self.client = client
+        self.name = name
+        self.params = params
+        self.offset = 0
+        self.row_limit = None
+
+    def range(self, start, end):
+        self.offset = start
+        self.row_limit = end - start + 1
+        return self
+
+    def execute(self):
+        return self.client._call(self)
+
+def booked_room_slots(tables, params):
+    """Mirror of the booked_room_slots SQL function"""
+    slots = [
+        {c: row[c] for c in ("room_id", "booking_date", "start_time", "end_time")}
+        for row in tables.get("bookings", [])
+        if row.get("status", "confirmed") == "confirmed"
+        and params["from_date"] <= row["booking_date"] <= params["to_date"]
+    ]
+    return sorted(slots, key=lambda slot: (str(slot["room_id"]), slot["booking_date"], slot["start_time"]))
+
+def _iso_date(value):
+    """A date as Postgres returns it: MM/DD/YYYY writes are read back as ISO"""
+    if isinstance(value, str) and "/" in value:
+        month, day, year = value.split("/")
+        return f"{year}-{int(month):02d}-{int(day):02d}"
+    return value
+
+def event_room_slots(tables, params):
+    """Mirror of the event_room_slots SQL function"""
+    slots = []
+    for row in tables.get("events", []):
+        event_date = _iso_date(row.get("event_date"))
+        if row.get("deleted_at") is None and event_date and params["from_date"] <= event_date <= params["to_date"]:
+            slot = {c: row.get(c) for c in ("id", "event_key", "location_name", "room", "event_time")}
+            slot["event_date"] = event_date
+            slots.append(slot)
+    return sorted(slots, key=lambda slot: str(slot["id"]))
+
+FUNCTIONS = {
+    "booked_room_slots": booked_room_slots,
+    "event_room_slots": event_room_slots,
+}
+
+class StubSupabase:
+    """
+    Thread-safe in-memory tables keyed by name
+    tables: {"buildings": [...], "rooms": [...], "events": [...]} to start from
+    """
+
+    def __init__(self, tables=None, latency=0.0):
+        self.tables = {name: [dict(row) for row in rows] for name, rows in (tables or {}).items()}
+        self.latency = latency
+        self.requests = 0
+        self._indexes = {}
+        self._lock = threading.Lock()
+
+    def table(self, name):
+        return StubQuery(self, name)
+
+    def rpc(self, name, params=None):
+        return StubRpc(self, name, params or {})
+
+    def _call(self, rpc):
+        if self.latency:
+            time.sleep(self.latency)
+
+        with self._lock:
+            self.requests += 1
+            if rpc.name not in FUNCTIONS:
+                raise RuntimeError(f"Could not find the function public.{rpc.name}")
+            data = FUNCTIONS[rpc.name](self.tables, rpc.params)
+            if isinstance(data, list):
+                end = None if rpc.row_limit is None else rpc.offset + rpc.row_limit
+                data = data[rpc.offset:end]
+            return StubResponse(data)
+
+    def _execute(self, query):
+        if self.latency:
+            time.sleep(self.latency)
+
+        with self._lock:
+            self.requests += 1
+            rows = self.tables.setdefault(query.table, [])
+
+            if query.action == "select":
+                result = [row for row in self._candidates(query, rows) if query._visible(row) and query._matches(row)]
+                total = len(result) if query.count else None
+                if query.order_by:
+                    column, desc = query.order_by
+                    # NULLs sort last ascending and first descending, like Postgres
+                    result.sort(key=lambda row: (row.get(column) is None, row.get(column)), reverse=desc)
+                if query.row_limit is not None:
+                    result = result[:query.row_limit]
+                if query.columns:
+                    result = [{c: row.get(c) for c in query.columns} for row in result]
+                return StubResponse(result, total)
+
+            policy = query.update_policy
+            if query.action == "update":
+                updated = [row for row in self._candidates(query, rows)
+                           if query._visible(row) and query._matches(row) and (policy is None or policy(row))]
+                if policy is not None and not all(policy(dict(row, **query.payload)) for row in updated):
+                    raise PermissionError("new row violates row-level security policy for table "
+                                          f"\"{query.table}\"")
+                for row in updated:
+                    row.update(query.payload)
+                self._reindex(query.table, query.payload)
+                return StubResponse([dict(row) for row in updated])
+
+            conflict = query.on_conflict if query.action == "upsert" else None
+            if conflict and (policy is not None or query.read_policy is not None):
+                # Checked before any row is written: the statement fails as a whole
+                for new_row in query.payload:
+                    existing = self._find(query.table, rows, conflict, new_row.get(conflict))
+                    if existing is None:
+                        continue
+                    if not query._visible(existing) or (
+                            policy is not None and not (policy(existing) and policy(dict(existing, **new_row)))):
+                        raise PermissionError("new row violates row-level security policy (USING expression) "
+                                              f"for table \"{query.table}\"")
+
+            written = []
+            for new_row in query.payload:
+                existing = self._find(query.table, rows, conflict, new_row.get(conflict)) if conflict else None
+                if existing is not None:
+                    existing.update(new_row)
+                    self._reindex(query.table, new_row, keep=conflict)
+                else:
+                    existing = dict(new_row, id=len(rows) + 1)
+                    rows.append(existing)
+                written.append(dict(existing))
+            return StubResponse(written)
+
+    def _index(self, table, column, rows):
+        """{str(value): [row positions]} for column, extended with rows appended since it was built"""
+        indexed, index = self._indexes.get((table, column), (0, {}))
+        for position in range(indexed, len(rows)):
+            value = rows[position].get(column)
+            if value is not None:
+                index.setdefault(str(value), []).append(position)
+        self._indexes[(table, column)] = (len(rows), index)
+        return index
+
+    def _reindex(self, table, values, keep=None):
+        """Drop the indexes of columns an in-place write changed"""
+        for column in values:
+            if column != keep:
+                self._indexes.pop((table, column), None)
+
+    def _find(self, table, rows, column, value):
+        """First row whose column equals value, by index"""
+        if value is None:
+            return None
+        positions = self._index(table, column, rows).get(str(value))
+        return rows[positions[0]] if positions else None
+
+    def _candidates(self, query, rows):
+        """The rows a query has to check: its lookup's rows in table order, or every row"""
+        if query.lookup is None:
+            return rows
+        column, keys = query.lookup
+        index = self._index(query.table, column, rows)
+        return [rows[position] for position in sorted(p for key in keys for p in index.get(key, ()))]
@@ -0,0 +1,220 @@
+"""
+Typed event records shared by the scraper and the populator
+EventRecord is a slotted class holding the scraped event fields, with place,
+category and organization strings interned: a few hundred distinct values
+repeat across thousands of events. Records still support event['field'] and
+event.get('field'), so code written against the old event dicts keeps working.
+
+Events are read and written as .json (indented array), .ndjson (one compact
+event per line), or, when pyarrow is installed, as a columnar batch: .parquet
+or .arrow (Arrow IPC stream). Columnar files are written and read in batches,
+so memory stays flat for multi-thousand-event backfills.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+EVENT_FIELDS = (
+    "title", "description", "location_name", "room", "date", "time", "time_24h", "end_time_24h",
+    "category", "categories", "organization_name", "organization_description", "links", "removed",
+)
+
+INTERNED_FIELDS = ("location_name", "room", "category", "organization_name")
+
+TOMBSTONE_FIELDS = ("title", "date", "location_name", "removed")
+
+COLUMNAR_SUFFIXES = {".parquet", ".arrow"}
+
+COLUMNAR_BATCH_SIZE = 10000
+
+class EventRecord:
+    """
+    One scraped event, or a tombstone (removed=True) for an event that left its source
+    The record is about a third the size of the equivalent dict, strings aside
+    """
+
+    __slots__ = EVENT_FIELDS
+
+    def __init__(self, title, description=None, location_name=None, room=None, date=None, time=None,
+                 time_24h=None, end_time_24h=None, category=None, categories=(), organization_name=None,
+                 organization_description=None, links=None, removed=False):
+        self.title = title
+        self.description = description
+        self.location_name = _intern(location_name)
+        self.room = _intern(room)
+        self.date = date
+        self.time = time
+        self.time_24h = time_24h
+        self.end_time_24h = end_time_24h
+        self.category = _intern(category)
+        self.categories = tuple(_intern(c) for c in categories or ())
+        self.organization_name = _intern(organization_name)
+        self.organization_description = organization_description
+        self.links = list(links or [])
+        self.removed = bool(removed)
+
+    @classmethod
+    def tombstone(cls, title, date, location_name):
+        return cls(title, date=date, location_name=location_name, removed=True)
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a record from an event dict (unknown keys are ignored)"""
+        return cls(**{field: data[field] for field in EVENT_FIELDS if field in data})
+
+    def to_dict(self):
+        """The event dict as written to JSON; tombstones keep only their identifying fields"""
+        if self.removed:
+            return {field: getattr(self, field) for field in TOMBSTONE_FIELDS}
+        data = {field: getattr(self, field) for field in EVENT_FIELDS[:-1]}
+        data["categories"] = list(self.categories)
+        return data
+
+    def __getitem__(self, field):
+        if field not in EVENT_FIELDS:
+            raise KeyError(field)
+        return getattr(self, field)
+
+    def __setitem__(self, field, value):
+        if field not in EVENT_FIELDS:
+            raise KeyError(field)
+        setattr(self, field, _intern(value) if field in INTERNED_FIELDS else value)
+
+    def __contains__(self, field):
+        return field in EVENT_FIELDS
+
+    def get(self, field, default=None):
+        return getattr(self, field) if field in EVENT_FIELDS else default
+
+    def __eq__(self, other):
+        if not isinstance(other, EventRecord):
+            return NotImplemented
+        return all(getattr(self, field) == getattr(other, field) for field in EVENT_FIELDS)
+
+    def __repr__(self):
+        return f"EventRecord({self.title!r}, date={self.date!r}, location_name={self.location_name!r})"
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+def arrow_schema():
+    """Columnar layout: repeated strings are dictionary-encoded, lists stay lists"""
+    interned = pa.dictionary(pa.int32(), pa.string())
+    types = {field: pa.string() for field in EVENT_FIELDS}
+    types.update({field: interned for field in INTERNED_FIELDS})
+    types.update({"categories": pa.list_(pa.string()), "links": pa.list_(pa.string()), "removed": pa.bool_()})
+    return pa.schema([(field, types[field]) for field in EVENT_FIELDS])
+
+def events_to_table(events, schema=None):
+    """A pyarrow Table with one row per record"""
+    schema = schema or arrow_schema()
+    columns = {field: [] for field in EVENT_FIELDS}
+    for event in events:
+        for field in EVENT_FIELDS:
+            columns[field].append(getattr(event, field))
+    columns["categories"] = [list(categories) for categories in columns["categories"]]
+
+    arrays = []
+    for field in schema:
+        if field.name in INTERNED_FIELDS:
+            arrays.append(pa.array(columns[field.name], type=pa.string()).dictionary_encode())
+        else:
+            arrays.append(pa.array(columns[field.name], type=field.type))
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+def _batches(events, size):
+    batch = []
+    for event in events:
+        batch.append(event)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def write_columnar(events, path, batch_size=COLUMNAR_BATCH_SIZE):
+    """Write records to .parquet or .arrow (IPC stream) batch by batch; returns the count"""
+    schema = arrow_schema()
+    count = 0
+    if path.suffix == ".parquet":
+        with pq.ParquetWriter(str(path), schema) as writer:
+            for batch in _batches(events, batch_size):
+                writer.write_table(events_to_table(batch, schema))
+                count += len(batch)
+    else:
+        # The stream format allows each batch its own dictionaries; the file format doesn't
+        with pa.OSFile(str(path), "wb") as sink, pa.ipc.new_stream(sink, schema) as writer:
+            for batch in _batches(events, batch_size):
+                writer.write_table(events_to_table(batch, schema))
+                count += len(batch)
+    return count
+
+def iter_columnar(path, batch_size=COLUMNAR_BATCH_SIZE):
+    """Yield records from a .parquet or .arrow file, one batch in memory at a time"""
+    if path.suffix == ".parquet":
+        batches = pq.ParquetFile(str(path)).iter_batches(batch_size=batch_size)
+        for batch in batches:
+            for row in batch.to_pylist():
+                yield EventRecord.from_dict(row)
+        return
+
+    with pa.memory_map(str(path), "r") as source:
+        for batch in pa.ipc.open_stream(source):
+            for row in batch.to_pylist():
+                yield EventRecord.from_dict(row)
+
+def write_events(events, path):
+    """
+    Write records in the format given by the file suffix
+    Returns the number written, or None if the format needs pyarrow and it is missing
+    """
+    path = Path(path)
+    if path.suffix in COLUMNAR_SUFFIXES:
+        if not HAS_PYARROW:
+            print(f"❌ Error: writing {path.suffix} files needs pyarrow")
+            print("   Install it with: pip install pyarrow")
+            return None
+        return write_columnar(events, path)
+
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        if path.suffix == ".ndjson":
+            for event in events:
+                f.write(json.dumps(event.to_dict(), ensure_ascii=False) + "\n")
+                count += 1
+        else:
+            data = [event.to_dict() for event in events]
+            json.dump(data, f, indent=2, ensure_ascii=False)
+            count = len(data)
+    return count
+
+def read_events(path):
+    """
+    Yield records from a .json array, .ndjson, .parquet or .arrow file
+    NDJSON and columnar files are streamed, so memory stays flat for large files
+    """
+    path = Path(path)
+    if path.suffix in COLUMNAR_SUFFIXES:
+        if not HAS_PYARROW:
+            print(f"❌ Error: reading {path.suffix} files needs pyarrow")
+            print("   Install it with: pip install pyarrow")
+            return
+        yield from iter_columnar(path)
+        return
+
+    with open(path, "r", encoding="utf-8") as f:
+        if path.suffix == ".ndjson":
+            for line in f:
+                if line.strip():
+                    yield EventRecord.from_dict(json.loads(line))
+        else:
+            for data in json.load(f):
+                yield EventRecord.from_dict(data)
@@ -1,22 +1,78 @@
 #!/usr/bin/env python3
 """
 Populate USpot database with scraped UVA Connections events
-Matches events to existing buildings and randomly assigns rooms
+Matches events to existing buildings and assigns each a free room
 """
 
+import argparse
+import hashlib
 import json
+import math
 import os
 import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
+from bisect import bisect_left, insort
+from collections import Counter, OrderedDict
 from difflib import SequenceMatcher
+from functools import lru_cache
+
+import run_metrics
+from event_records import read_events
 
 try:
+    import httpx
     from supabase import create_client, Client
 except ImportError:
     print("❌ Error: supabase-py not installed")
     print("   Install it with: pip install supabase")
     exit(1)
 
+INSERT_CHUNK_SIZE = 200
+
+WRITER_WORKERS = 4
+
+# Requests per second across all writer workers
+WRITER_RATE_LIMIT = 10.0
+
+WRITE_RETRIES = 4
+
+WRITE_RETRY_BACKOFF = 0.5
+
+RETRYABLE_STATUS_CODES = {"429", "500", "502", "503", "504"}
+
+# PostgREST caps responses at 1000 rows by default
+CATALOG_PAGE_SIZE = 1000
+
+# --server-match: events per ingest_scraped_events call, and the trigram
+# similarity a building name needs to count as a match in the database
+RPC_BATCH_SIZE = 1000
+
+RPC_MIN_SIMILARITY = 0.3
+
+SYSTEM_USER_ID = '00000000-0000-0000-0000-000000000000'
+
+BUILDING_COLUMNS = "id, name, category, latitude, longitude, updated_at"
+
+ROOM_COLUMNS = "id, building_id, room_name, capacity, available"
+
+EXISTING_EVENT_COLUMNS = "event_key, content_hash, deleted_at, location_name"
+
+# Events that hold rooms: scraped and user-created alike
+# Event keys per dedup query (they go in the URL)
+DEDUP_KEY_BATCH = 100
+
+EVENT_KEY_CONFLICT = "event_key"
+
+HASHED_EVENT_FIELDS = [
+    "title", "description", "location_name", "room", "date", "time_24h",
+    "category", "organization_name", "organization_description", "links",
+]
+
 def load_env():
     """Load environment variables from .env file"""
     env_path = Path(__file__).parent / '.env'
@@ -35,40 +91,90 @@ def load_env():
 
     return env_vars
 
+BUILDING_NAME_REPLACEMENTS = {
+    "shannon lib": "shannon library",
+    "clemons lib": "clemons library",
+    "brown lib": "brown science & engineering library",
+    "ohill": "o'hill dining hall",
+    "o hill": "o'hill dining hall",
+    "newcomb": "newcomb hall",
+    "rotunda": "the rotunda",
+    "lawn": "the lawn",
+    "old cabell": "old cabell hall",
+    "new cabell": "new cabell hall",
+    "rice": "rice hall",
+    "olsson": "olsson hall",
+    "thornton": "thornton hall",
+    "jpa": "john paul jones arena",
+    "jpj": "john paul jones arena",
+    "scott": "scott stadium",
+    "cobb": "cobb hall",
+    "rouss": "rouss-robertson hall (mcintire)",
+    "robertson": "rouss-robertson hall (mcintire)",
+    "physics": "physics building",
+    "chemistry": "chemistry building",
+    "meb": "mechanical engineering building",
+    "msb": "materials science building (msb)",
+}
+
+MATCH_NGRAM_SIZE = 3
+
+MATCH_SHORTLIST_SIZE = 25
+
+MATCH_CACHE_FILE = Path(__file__).parent / 'location_match_cache.json'
+
+MATCH_CACHE_MAX_ENTRIES = 5000
+
+# Known street numbers with coordinates, per normalized street name; numbers
+# in between are interpolated along the street
+ADDRESS_TABLE_FILE = Path(__file__).parent / 'street_addresses.json'
+
+# How far past the first/last known number on a street an address is still placed
+ADDRESS_NUMBER_TOLERANCE = 200
+
+# Addresses farther than this from every building keep the random fallback
+NEAREST_BUILDING_MAX_METERS = 800
+
+METERS_PER_DEGREE = 111320
+
+# Seats a room needs for an event of a category; rooms with capacity 0 (unknown)
+# are still used, after every room known to be big enough
+EVENT_MIN_CAPACITY = {
+    "Arts": 40,
+    "Entertainment": 40,
+    "Sports": 30,
+    "Free Food": 20,
+    "Club Events": 15,
+}
+
+EVENT_DEFAULT_MIN_CAPACITY = 10
+
+# How long a room is held when the newsletter gives no end time
+EVENT_DEFAULT_DURATION_MINUTES = 90
+
+MINUTES_PER_DAY = 24 * 60
+
+# Changing the seed reshuffles which of several equally good rooms an event gets
+ROOM_ASSIGNMENT_SEED = "uspot-rooms"
+
+STREET_ADDRESS_REGEX = re.compile(r"^\s*(\d{1,5})[A-Za-z]?\s+([A-Za-z][A-Za-z0-9 .'-]*?)[\s.,]*$")
+
+STREET_ABBREVIATIONS = {
+    "ave": "avenue", "av": "avenue", "st": "street", "rd": "road", "dr": "drive",
+    "blvd": "boulevard", "ln": "lane", "pl": "place", "ct": "court", "hwy": "highway",
+    "n": "north", "s": "south", "e": "east", "w": "west",
+    "jpa": "jefferson park avenue",
+}
+
+@lru_cache(maxsize=4096)
 def normalize_building_name(name):
-    """Normalize building name for matching"""
+    """Normalize building name for matching (memoized, venue strings recur every run)"""
     if not name:
         return ""
 
     name = name.lower().strip()
 
-    replacements = {
-        "shannon lib": "shannon library",
-        "clemons lib": "clemons library",
-        "brown lib": "brown science & engineering library",
-        "ohill": "o'hill dining hall",
-        "o hill": "o'hill dining hall",
-        "newcomb": "newcomb hall",
-        "rotunda": "the rotunda",
-        "lawn": "the lawn",
-        "old cabell": "old cabell hall",
-        "new cabell": "new cabell hall",
-        "rice": "rice hall",
-        "olsson": "olsson hall",
-        "thornton": "thornton hall",
-        "jpa": "john paul jones arena",
-        "jpj": "john paul jones arena",
-        "scott": "scott stadium",
-        "cobb": "cobb hall",
-        "rouss": "rouss-robertson hall (mcintire)",
-        "robertson": "rouss-robertson hall (mcintire)",
-        "physics": "physics building",
-        "chemistry": "chemistry building",
-        "meb": "mechanical engineering building",
-        "msb": "materials science building (msb)",
-    }
-
-    for key, value in replacements.items():
+    for key, value in BUILDING_NAME_REPLACEMENTS.items():
         if key in name:
             return value
 
@@ -108,6 +214,489 @@ def match_building(location_name, buildings):
 
     return None, 0
 
+def char_ngrams(text, n=MATCH_NGRAM_SIZE):
+    """Set of character n-grams of text (empty if text is shorter than n)"""
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+def buildings_fingerprint(buildings):
+    """
+    Fingerprint of the buildings table (row count + latest updated_at)
+    updated_at moves on edits too, through the add_catalog_updated_at_triggers trigger
+    """
+    latest = max((b.get('updated_at') or '' for b in buildings), default='')
+    return f"{len(buildings)}:{latest}"
+
+class LocationMatchCache:
+    """
+    On-disk LRU cache of raw location_name -> (building id, confidence)
+    Stored as JSON next to this script and discarded whenever the buildings
+    fingerprint changes, so stale building ids are never returned.
+    """
+
+    def __init__(self, path=MATCH_CACHE_FILE, fingerprint=None, max_entries=MATCH_CACHE_MAX_ENTRIES):
+        self.path = Path(path)
+        self.fingerprint = fingerprint
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.invalidated = False
+        self.load()
+
+    def load(self):
+        """Load cache from disk, ignoring it if missing, corrupt or built for other buildings"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+
+        if data.get('fingerprint') != self.fingerprint:
+            self.invalidated = True
+            return
+
+        for location, building_id, confidence in data.get('entries', []):
+            self.entries[location] = (building_id, confidence)
+
+    def save(self):
+        """Write cache to disk in LRU order (least recently used first)"""
+        data = {
+            'fingerprint': self.fingerprint,
+            'entries': [[location, building_id, confidence]
+                        for location, (building_id, confidence) in self.entries.items()]
+        }
+        try:
+            with open(self.path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+        except OSError as e:
+            print(f"⚠️  Could not save location match cache: {e}")
+
+    def get(self, location_name):
+        """Returns (building_id, confidence) or None on a miss"""
+        entry = self.entries.get(location_name)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(location_name)
+        self.hits += 1
+        return entry
+
+    def put(self, location_name, building_id, confidence):
+        self.entries[location_name] = (building_id, confidence)
+        self.entries.move_to_end(location_name)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+class BuildingMatcher:
+    """
+    Building matcher built once per run
+    Pre-normalizes building names and indexes them by exact name and character
+    trigrams, so each lookup only scores a short candidate list instead of
+    running SequenceMatcher against every building. Exact and containment
+    matches are always found, and a shortlisted building gets the same score
+    and tie-breaking (first building wins) as in match_building. Fuzzy matches
+    are approximate, though: the shortlist keeps the buildings sharing the most
+    trigrams, so on catalogs larger than the seed buildings a misspelled name
+    can miss the building match_building would pick (or find none). With a
+    LocationMatchCache, previously seen location strings skip scoring entirely.
+    """
+
+    def __init__(self, buildings, shortlist_size=MATCH_SHORTLIST_SIZE, cache=None):
+        self.buildings = list(buildings)
+        self.shortlist_size = shortlist_size
+        self.cache = cache
+        self.by_id = {b['id']: b for b in self.buildings}
+        self.names = [normalize_building_name(b['name']) for b in self.buildings]
+        self.exact = {}
+        self.postings = {}
+        self.gram_counts = []
+        self.short_names = []
+
+        for idx, name in enumerate(self.names):
+            self.exact.setdefault(name, idx)
+            grams = char_ngrams(name)
+            self.gram_counts.append(len(grams))
+            if not grams:
+                self.short_names.append(idx)
+            for gram in grams:
+                self.postings.setdefault(gram, []).append(idx)
+
+    def candidates(self, normalized_location):
+        """Indices of buildings worth scoring for a normalized location, in catalog order"""
+        grams = char_ngrams(normalized_location)
+        if not grams:
+            return range(len(self.buildings))
+
+        hits = Counter()
+        for gram in grams:
+            hits.update(self.postings.get(gram, ()))
+
+        shortlist = {idx for idx, _ in hits.most_common(self.shortlist_size)}
+        shortlist.update(self.short_names)
+        if normalized_location in self.exact:
+            shortlist.add(self.exact[normalized_location])
+        # Containment always scores 0.95, so every building sharing all of the
+        # location's grams (or all of its own) must be scored
+        for idx, count in hits.items():
+            if count == len(grams) or count == self.gram_counts[idx]:
+                shortlist.add(idx)
+
+        return sorted(shortlist)
+
+    def match(self, location_name):
+        """
+        Match location name to a building, consulting the cache first
+        Returns (building, match_confidence) or (None, 0)
+        """
+        if not location_name or not self.buildings:
+            return None, 0
+
+        if self.cache is not None:
+            cached = self.cache.get(location_name)
+            if cached is not None:
+                building_id, confidence = cached
+                if building_id is None:
+                    return None, 0
+                if building_id in self.by_id:
+                    return self.by_id[building_id], confidence
+
+        building, confidence = self.score(location_name)
+
+        if self.cache is not None:
+            self.cache.put(location_name, building['id'] if building else None, confidence)
+
+        return building, confidence
+
+    def score(self, location_name):
+        """Score the shortlisted buildings for location name, bypassing the cache"""
+        normalized_location = normalize_building_name(location_name)
+
+        best_idx = None
+        best_score = 0
+
+        for idx in self.candidates(normalized_location):
+            building_name = self.names[idx]
+
+            if normalized_location in building_name or building_name in normalized_location:
+                score = 0.95
+            else:
+                matcher = SequenceMatcher(None, normalized_location, building_name)
+                if matcher.real_quick_ratio() <= best_score or matcher.quick_ratio() <= best_score:
+                    continue
+                score = matcher.ratio()
+
+            if score > best_score:
+                best_score = score
+                best_idx = idx
+
+        if best_score >= 0.6:
+            return self.buildings[best_idx], best_score
+
+        return None, 0
+
+def normalize_street(street):
+    """ "W. Main St." -> "west main street", the key format of street_addresses.json"""
+    tokens = re.findall(r"[a-z0-9']+", street.lower())
+    return " ".join(STREET_ABBREVIATIONS.get(token, token) for token in tokens)
+
+def parse_street_address(location):
+    """ "1515 University Ave." -> (1515, "university avenue"), None if not a street address"""
+    if not location:
+        return None
+    m = STREET_ADDRESS_REGEX.match(location)
+    if not m:
+        return None
+    return int(m.group(1)), normalize_street(m.group(2))
+
+def load_address_table(path=ADDRESS_TABLE_FILE):
+    """Street -> [(number, latitude, longitude)] sorted by number (empty if missing)"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            table = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError) as e:
+        print(f"⚠️  Could not load address table {path}: {e}")
+        return {}
+    return {normalize_street(street): sorted(tuple(anchor) for anchor in anchors)
+            for street, anchors in table.items()}
+
+def geocode_address(location, address_table):
+    """
+    Resolve a street address like "1515 University Ave." to (latitude, longitude)
+    Returns None if it is not an address, the street is unknown, or the number
+    is too far from every known number on the street
+    """
+    parsed = parse_street_address(location)
+    if not parsed:
+        return None
+    number, street = parsed
+    anchors = address_table.get(street)
+    if not anchors:
+        return None
+
+    i = bisect_left(anchors, (number,))
+    if i < len(anchors) and anchors[i][0] == number:
+        return anchors[i][1], anchors[i][2]
+    if 0 < i < len(anchors):
+        (n0, lat0, lon0), (n1, lat1, lon1) = anchors[i - 1], anchors[i]
+        t = (number - n0) / (n1 - n0)
+        return lat0 + t * (lat1 - lat0), lon0 + t * (lon1 - lon0)
+
+    nearest = anchors[0] if i == 0 else anchors[-1]
+    if abs(nearest[0] - number) <= ADDRESS_NUMBER_TOLERANCE:
+        return nearest[1], nearest[2]
+    return None
+
+class BuildingKDTree:
+    """
+    2-d tree over building coordinates, built once per run
+    Coordinates are projected to meters around the catalog's mean latitude,
+    which is accurate at campus scale; nearest() visits O(log n) nodes on average
+    """
+
+    def __init__(self, buildings):
+        points = []
+        for building in buildings:
+            try:
+                points.append((float(building['latitude']), float(building['longitude']), building))
+            except (KeyError, TypeError, ValueError):
+                continue
+
+        mean_latitude = sum(p[0] for p in points) / len(points) if points else 0.0
+        self.x_scale = METERS_PER_DEGREE * math.cos(math.radians(mean_latitude))
+        self.size = len(points)
+        self.root = self._build([(lon * self.x_scale, lat * METERS_PER_DEGREE, building)
+                                 for lat, lon, building in points], 0)
+
+    def _build(self, points, axis):
+        """Node: [x, y, building, axis, left, right], split on the median of axis"""
+        if not points:
+            return None
+        points.sort(key=lambda p: p[axis])
+        mid = len(points) // 2
+        x, y, building = points[mid]
+        return [x, y, building, axis,
+                self._build(points[:mid], 1 - axis),
+                self._build(points[mid + 1:], 1 - axis)]
+
+    def nearest(self, latitude, longitude):
+        """Returns (building, distance in meters), or (None, None) for an empty tree"""
+        if self.root is None:
+            return None, None
+
+        target = (longitude * self.x_scale, latitude * METERS_PER_DEGREE)
+        best = [None, float('inf')]
+
+        def visit(node):
+            if node is None:
+                return
+            x, y, building, axis, left, right = node
+            dist_sq = (x - target[0]) ** 2 + (y - target[1]) ** 2
+            if dist_sq < best[1]:
+                best[0], best[1] = building, dist_sq
+
+            delta = target[axis] - (x, y)[axis]
+            near, far = (left, right) if delta < 0 else (right, left)
+            visit(near)
+            if delta * delta < best[1]:
+                visit(far)
+
+        visit(self.root)
+        return best[0], math.sqrt(best[1])
+
+class AddressLocator:
+    """
+    Fallback for locations that match no building name: geocode street
+    addresses against the local address table and use the nearest building
+    """
+
+    def __init__(self, buildings, address_table, max_distance=NEAREST_BUILDING_MAX_METERS):
+        self.address_table = address_table
+        self.max_distance = max_distance
+        self.tree = BuildingKDTree(buildings)
+
+    def locate(self, location_name):
+        """Returns (building, distance_m), or (None, None) if the location can't be placed"""
+        coords = geocode_address(location_name, self.address_table)
+        if coords is None:
+            return None, None
+        building, distance = self.tree.nearest(*coords)
+        if building is None or distance > self.max_distance:
+            return None, None
+        return building, distance
+
+def time_to_minutes(value):
+    """Minutes since midnight of "HH:MM[:SS]" (None if unparseable)"""
+    try:
+        hours, minutes = str(value).split(':')[:2]
+        return int(hours) * 60 + int(minutes)
+    except (TypeError, ValueError):
+        return None
+
+def event_interval(event):
+    """
+    (start, end) minutes a scraped event holds a room, or (None, None) without a time
+    Uses end_time_24h when the newsletter gives a range, else the default duration
+    """
+    start = time_to_minutes(event.get('time_24h'))
+    if start is None:
+        return None, None
+    end = time_to_minutes(event.get('end_time_24h'))
+    if end is None or end <= start:
+        end = start + EVENT_DEFAULT_DURATION_MINUTES
+    return start, min(end, MINUTES_PER_DAY)
+
+def event_min_capacity(event):
+    """Seats needed by the most demanding of the event's categories"""
+    categories = event.get('categories') or [event.get('category')]
+    return max(EVENT_MIN_CAPACITY.get(category, EVENT_DEFAULT_MIN_CAPACITY) for category in categories)
+
+def stable_hash(*parts):
+    """Run-independent integer hash (hash() of a str is salted per process)"""
+    return int(hashlib.sha1("|".join(parts).encode('utf-8')).hexdigest()[:12], 16)
+
+class RoomScheduler:
+    """
+    Deterministic, capacity-aware room assignment
+    Keeps a list of held (start, end, holder) intervals per (room, date), sorted
+    by start. Held intervals may overlap each other (bookings, events held with
+    the default duration), so a check scans every interval starting before the
+    candidate ends; a room has a handful per day. Intervals
+    come from confirmed bookings and events already in the database (both
+    loaded once per date) and from the events assigned during the run.
+    Candidates are tried best fit first, ties broken by a hash of the event key,
+    so the same input gets the same rooms on every run
+    """
+
+    def __init__(self, buildings, rooms_by_building, seed=ROOM_ASSIGNMENT_SEED):
+        self.rooms_by_building = rooms_by_building
+        self.seed = seed
+        building_names = {b['id']: b['name'].lower() for b in buildings}
+        self.room_ids_by_name = {
+            (building_names.get(room['building_id']), (room.get('room_name') or '').lower()): room['id']
+            for rooms in rooms_by_building.values() for room in rooms
+        }
+        self.intervals = {}
+        self.placements = {}
+        self.loaded_dates = set()
+        self.stats = Counter()
+
+    def load_window(self, supabase: Client, iso_dates):
+        """
+        Hold the rooms of confirmed bookings and existing events on dates not
+        loaded yet; each date is fetched once per run
+        """
+        dates = sorted({d for d in iso_dates if d} - self.loaded_dates)
+        if not dates:
+            return
+        first = datetime.strptime(dates[0], "%Y-%m-%d").date()
+        last = datetime.strptime(dates[-1], "%Y-%m-%d").date()
+        self.loaded_dates.update((first + timedelta(days=n)).isoformat() for n in range((last - first).days + 1))
+        self.load_bookings(supabase, dates[0], dates[-1])
+
+        run_metrics.count("rooms", "requests")
+        try:
+            self.add_existing_events(fetch_room_holders(supabase, dates[0], dates[-1]))
+        except Exception as e:
+            run_metrics.count("rooms", "errors")
+            print(f"⚠️  Could not load existing events for {dates[0]}..{dates[-1]}, ignoring their rooms: {e}")
+
+    def load_bookings(self, supabase: Client, first, last, page_size=CATALOG_PAGE_SIZE):
+        """
+        Hold the rooms of confirmed bookings between two ISO dates
+        """
+        run_metrics.count("rooms", "requests")
+        try:
+            slots = fetch_rpc_rows(supabase, 'booked_room_slots', {'from_date': first, 'to_date': last},
+                                   page_size)
+        except Exception as e:
+            run_metrics.count("rooms", "errors")
+            print(f"⚠️  Could not load room bookings for {first}..{last}, ignoring them: {e}")
+            return
+
+        for slot in slots:
+            start = time_to_minutes(slot.get('start_time'))
+            end = time_to_minutes(slot.get('end_time'))
+            if start is None or end is None:
+                continue
+            holder = f"booking:{slot['room_id']}:{slot['booking_date']}:{start}"
+            self._hold(holder, slot['room_id'], slot['booking_date'], start, end)
+            self.stats['bookings'] += 1
+
+    def add_existing_events(self, rows):
+        """
+        Hold the rooms of events already in the database (rows of event_room_slots)
+        Scraped events hold under their event key, the holder assign() uses, so a
+        changed event gives up its old slot; events created in the app have no
+        key and hold under their row id. Events placed earlier in the run are kept
+        """
+        for row in rows:
+            room_id = self.room_ids_by_name.get(((row.get('location_name') or '').lower(),
+                                                 (row.get('room') or '').lower()))
+            start = time_to_minutes(row.get('event_time'))
+            holder = row.get('event_key') or f"event:{row['id']}"
+            if room_id is None or start is None or (row.get('event_key') and holder in self.placements):
+                continue
+            end = min(start + EVENT_DEFAULT_DURATION_MINUTES, MINUTES_PER_DAY)
+            self._hold(holder, room_id, row['event_date'], start, end)
+
+    def _hold(self, holder, room_id, iso_date, start, end):
+        self._release(holder)
+        insort(self.intervals.setdefault((room_id, iso_date), []), (start, end, holder))
+        self.placements[holder] = (room_id, iso_date, start, end)
+
+    def _release(self, holder):
+        placement = self.placements.pop(holder, None)
+        if placement:
+            room_id, iso_date, start, end = placement
+            slots = self.intervals[(room_id, iso_date)]
+            del slots[bisect_left(slots, (start, end, holder))]
+
+    def is_free(self, room_id, iso_date, start, end):
+        """Whether [start, end) overlaps nothing held in the room that day"""
+        slots = self.intervals.get((room_id, iso_date))
+        if not slots:
+            return True
+        # Any interval starting before end can reach past start, not just the nearest one
+        return all(slot_end <= start for _, slot_end, _ in slots[:bisect_left(slots, (end,))])
+
+    def _rank(self, room, event_key, room_hint, previous_room_id):
+        capacity = room.get('capacity') or 0
+        return (
+            not (room_hint and room_hint.lower() in (room.get('room_name') or '').lower()),
+            room['id'] != previous_room_id,
+            capacity == 0,
+            capacity,
+            stable_hash(self.seed, event_key, str(room['id'])),
+        )
+
+    def assign(self, event_key, building_id, iso_date, start, end, min_capacity, room_hint=None):
+        """
+        Hold the first free room of the building with at least min_capacity seats
+        Rooms the event already had, or the newsletter names, are tried first.
+        Returns the room row, or None if every room is taken or too small
+        """
+        previous = self.placements.get(event_key)
+        self._release(event_key)
+        candidates = [
+            room for room in self.rooms_by_building.get(building_id, [])
+            if room.get('available') is not False
+            and ((room.get('capacity') or 0) == 0 or room['capacity'] >= min_capacity)
+        ]
+        candidates.sort(key=lambda room: self._rank(room, event_key, room_hint, previous and previous[0]))
+
+        for room in candidates:
+            if start is None or iso_date is None:
+                self.stats['assigned'] += 1
+                return room
+            if self.is_free(room['id'], iso_date, start, end):
+                self._hold(event_key, room['id'], iso_date, start, end)
+                self.stats['assigned'] += 1
+                return room
+            self.stats['conflicts'] += 1
+
+        self.stats['no_free_room'] += 1
+        return None
+
 def get_random_building(buildings, exclude_categories=None):
     """Get a random building from the list, optionally excluding certain categories"""
     if exclude_categories:
@@ -138,80 +727,554 @@ def get_or_create_system_user(supabase: Client):
             print("   Events will be created without user attribution")
             return None
 
-def populate_database(events_file="uva_connections_events.json"):
-    """Main function to populate database with events"""
-    print("🚀 Starting database population...\n")
+def to_iso_date(date_str):
+    """Convert scraper date "MM/DD/YYYY" to "YYYY-MM-DD" (None if unparseable)"""
+    try:
+        return datetime.strptime(date_str, "%m/%d/%Y").strftime("%Y-%m-%d")
+    except (TypeError, ValueError):
+        return None
+
+def normalize_key_part(value):
+    """Lowercase and collapse punctuation/whitespace so cosmetic edits keep the same key"""
+    return re.sub(r'[^a-z0-9]+', ' ', (value or '').lower()).strip()
+
+def event_natural_key(event):
+    """
+    Stable natural key for a scraped event: normalized title + date + location
+    Example: "bodo s bagel study break|2025-11-16|newcomb hall"
+    """
+    return "|".join([
+        normalize_key_part(event.get('title')),
+        to_iso_date(event.get('date')) or '',
+        normalize_key_part(event.get('location_name')),
+    ])
+
+def event_content_hash(event):
+    """Hash of the scraped fields, so unchanged events can be skipped on re-runs"""
+    content = {field: event.get(field) for field in HASHED_EVENT_FIELDS}
+    payload = json.dumps(content, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def fetch_existing_events(supabase: Client, event_keys):
+    """
+    Fetch event_key -> row for the given keys, a batch of keys per query
+    Rows carry the content hash for dedup and the location the event had.
+    Soft-deleted events are left out, so an event that reappears is written again.
+    The anon key sees these rows through the system-events SELECT policy
+    """
+    existing = {}
+    for keys in iter_chunks(sorted(set(event_keys)), DEDUP_KEY_BATCH):
+        def with_keys(query, keys=keys):
+            return query.in_('event_key', keys)
+
+        for page in iter_table_pages(supabase, 'events', EXISTING_EVENT_COLUMNS, query_filter=with_keys,
+                                     key='event_key'):
+            existing.update((row['event_key'], row) for row in page if not row.get('deleted_at'))
+    return existing
+
+def fetch_room_holders(supabase: Client, first, last):
+    """
+    Active events between two ISO dates, with the room and time each one holds
+    Read through event_room_slots, since events RLS hides app-created events from the anon key
+    """
+    return fetch_rpc_rows(supabase, 'event_room_slots', {'from_date': first, 'to_date': last})
+
+def soft_delete_events(supabase: Client, event_keys, chunk_size=INSERT_CHUNK_SIZE, touched_locations=None):
+    """
+    Mark events removed from the source as deleted instead of deleting the rows
+    The deleted rows' location names are added to touched_locations when given
+    Returns the number of rows that were soft-deleted
+    """
+    deleted_at = datetime.now(timezone.utc).isoformat()
+    deleted = 0
+    sent = 0
+    for chunk in iter_chunks(sorted(event_keys), max(1, chunk_size)):
+        sent += len(chunk)
+        try:
+            response = (
+                supabase.table('events')
+                .update({'deleted_at': deleted_at})
+                .in_('event_key', chunk)
+                .is_('deleted_at', 'null')
+                .execute()
+            )
+            deleted += len(response.data)
+            if touched_locations is not None:
+                touched_locations.update(row.get('location_name') for row in response.data)
+        except Exception as e:
+            print(f"❌ Error soft-deleting {len(chunk)} removed events: {e}")
+    if deleted < sent:
+        # An UPDATE only reaches rows the key can SELECT, and still answers 200 when that is none
+        print(f"⚠️  Only {deleted} of {sent} removed events were soft-deleted; the rest were already deleted, "
+              f"never written, or not visible to this key (row-level security)")
+    return deleted
 
+def new_insert_result():
+    """Counters for the writes of one run"""
+    return {
+        'inserted': 0,
+        'errors': 0,
+        'requests': 0,
+        'retries': 0,
+        'request_latencies': [],
+        'elapsed': 0.0
+    }
+
+def percentile(values, pct):
+    """Nearest-rank percentile of values (0 if empty)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))]
+
+def is_retryable_error(error):
+    """True for network errors, HTTP 429/5xx and PostgREST connection errors"""
+    if isinstance(error, httpx.TransportError):
+        return True
+    code = str(getattr(error, 'code', '') or '')
+    return code in RETRYABLE_STATUS_CODES or code.startswith('PGRST00')
+
+class TokenBucket:
+    """
+    Thread-safe token bucket limiting requests per second across all workers
+    A rate of 0 or None disables limiting
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate or 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available, then take it"""
+        if not self.rate:
+            return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+class EventWriter:
+    """
+    Writer stage for event rows
+    Chunks are written by a pool of worker threads that share one Supabase
+    client, and so one pooled HTTP session. Every request takes a token from a
+    shared TokenBucket, 429/5xx responses are retried with jittered exponential
+    backoff, and any other failure bisects the chunk until the bad rows are
+    isolated. submit() blocks once 2 x workers chunks are in flight, which
+    keeps memory bounded when the producer is faster than the database.
+    """
+
+    def __init__(self, supabase: Client, workers=WRITER_WORKERS, rate_limit=WRITER_RATE_LIMIT,
+                 on_conflict=None, retries=WRITE_RETRIES, backoff=WRITE_RETRY_BACKOFF):
+        self.supabase = supabase
+        self.on_conflict = on_conflict
+        self.retries = retries
+        self.backoff = backoff
+        self.bucket = TokenBucket(rate_limit)
+        self.executor = ThreadPoolExecutor(max_workers=max(1, workers))
+        self.slots = threading.BoundedSemaphore(max(1, workers) * 2)
+        self.lock = threading.Lock()
+        self.result = new_insert_result()
+        self.started = None
+
+    def submit(self, rows):
+        """Queue rows for writing as one request (blocks while the pool is saturated)"""
+        if not rows:
+            return
+        if self.started is None:
+            self.started = time.perf_counter()
+        self.slots.acquire()
+        future = self.executor.submit(self._write, rows)
+        future.add_done_callback(lambda _: self.slots.release())
+
+    def close(self):
+        """Wait for all queued writes and return the result counters"""
+        self.executor.shutdown(wait=True)
+        if self.started is not None:
+            self.result['elapsed'] = time.perf_counter() - self.started
+        return self.result
+
+    def _send(self, rows):
+        """One write request, retried on 429/5xx"""
+        for attempt in range(self.retries + 1):
+            self.bucket.acquire()
+            start = time.perf_counter()
+            try:
+                table = self.supabase.table('events')
+                if self.on_conflict:
+                    table.upsert(rows, on_conflict=self.on_conflict).execute()
+                else:
+                    table.insert(rows).execute()
+                return time.perf_counter() - start
+            except Exception as e:
+                if attempt == self.retries or not is_retryable_error(e):
+                    raise
+                with self.lock:
+                    self.result['retries'] += 1
+            finally:
+                with self.lock:
+                    self.result['requests'] += 1
+                    self.result['request_latencies'].append(time.perf_counter() - start)
+            time.sleep(self.backoff * (2 ** attempt) * random.uniform(0.5, 1.5))
+
+    def _write(self, rows):
+        try:
+            elapsed = self._send(rows)
+        except Exception as e:
+            if len(rows) > 1 and not is_retryable_error(e):
+                mid = len(rows) // 2
+                self._write(rows[:mid])
+                self._write(rows[mid:])
+                return
+            with self.lock:
+                self.result['errors'] += len(rows)
+                error_count = self.result['errors']
+            if error_count <= 3:
+                print(f"   ⚠️  Error writing event '{rows[0]['title'][:40]}': {str(e)[:80]}")
+            return
+
+        with self.lock:
+            self.result['inserted'] += len(rows)
+        print(f"   📦 Chunk of {len(rows)} events written in {elapsed * 1000:.0f} ms")
+
+def print_write_summary(result):
+    """Sustained throughput and request latency percentiles of a write stage"""
+    print(f"   Requests sent: {result['requests']} ({result['retries']} retried)")
+    if result['elapsed'] > 0:
+        print(f"   Sustained rate: {result['inserted'] / result['elapsed']:.1f} rows/sec "
+              f"({result['elapsed']:.2f}s total)")
+    latencies = result['request_latencies']
+    if latencies:
+        print(f"   Request latency: p50 {percentile(latencies, 50) * 1000:.0f} ms, "
+              f"p95 {percentile(latencies, 95) * 1000:.0f} ms")
+
+def iter_chunks(items, size):
+    """Yield lists of up to size items from any iterable, without materializing it"""
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def iter_events_file(events_file):
+    """
+    Yield scraped events from a .json array, an .ndjson file (one event per line)
+    or a .parquet/.arrow batch. NDJSON and columnar files are streamed, so
+    memory stays flat for large files
+    """
+    yield from read_events(events_file)
+
+def connect_supabase():
+    """Create a Supabase client from .env, or None if it is not configured"""
     env_vars = load_env()
     if not env_vars:
-        return
+        return None
 
     supabase_url = env_vars.get('VITE_SUPABASE_URL')
     supabase_key = env_vars.get('VITE_SUPABASE_ANON_KEY')
 
     if not supabase_url or not supabase_key:
         print("❌ Error: VITE_SUPABASE_URL or VITE_SUPABASE_ANON_KEY not found in .env")
-        return
+        return None
 
     supabase: Client = create_client(supabase_url, supabase_key)
     print("✅ Connected to Supabase")
+    return supabase
 
-    print("📥 Loading scraped events...")
-    try:
-        with open(events_file, 'r', encoding='utf-8') as f:
-            scraped_events = json.load(f)
-    except FileNotFoundError:
-        print(f"❌ Error: {events_file} not found. Run scrape-connections-events.py first")
-        return
+def iter_table_pages(supabase: Client, table, columns, page_size=CATALOG_PAGE_SIZE, query_filter=None,
+                     key='id'):
+    """
+    Yield pages of rows from table ordered by key, using keyset pagination
+    (key > last key seen) so every page is an index range scan, not an OFFSET
+    query_filter(query) can add filters; columns must include key
+    """
+    last_key = None
+    while True:
+        query = supabase.table(table).select(columns).order(key).limit(page_size)
+        if query_filter is not None:
+            query = query_filter(query)
+        if last_key is not None:
+            query = query.gt(key, last_key)
+        rows = query.execute().data
+        if rows:
+            yield rows
+        if len(rows) < page_size:
+            return
+        last_key = rows[-1][key]
 
-    print(f"✅ Loaded {len(scraped_events)} events from {events_file}")
+def fetch_rpc_rows(supabase: Client, name, params, page_size=CATALOG_PAGE_SIZE):
+    """
+    Every row of a set-returning database function, fetched in pages since
+    PostgREST caps the rows of one response; the function must order its rows,
+    so offset pages neither overlap nor skip
+    """
+    rows = []
+    while True:
+        page = supabase.rpc(name, params).range(len(rows), len(rows) + page_size - 1).execute().data or []
+        rows.extend(page)
+        if len(page) < page_size:
+            return rows
 
-    print("📥 Fetching buildings from database...")
-    try:
-        response = supabase.table('buildings').select('*').execute()
-        buildings = response.data
-        print(f"✅ Found {len(buildings)} buildings in database")
-    except Exception as e:
-        print(f"❌ Error fetching buildings: {e}")
-        return
+def load_buildings(supabase: Client, page_size=CATALOG_PAGE_SIZE):
+    """All buildings, projected to the columns matching and event rows need"""
+    return [building for page in iter_table_pages(supabase, 'buildings', BUILDING_COLUMNS, page_size)
+            for building in page]
+
+def load_rooms_by_building(supabase: Client, page_size=CATALOG_PAGE_SIZE):
+    """
+    Rooms grouped by building id, indexed page by page as they arrive
+    Returns (rooms_by_building, room_count)
+    """
+    rooms_by_building = {}
+    room_count = 0
+    for page in iter_table_pages(supabase, 'rooms', ROOM_COLUMNS, page_size):
+        for room in page:
+            rooms_by_building.setdefault(room['building_id'], []).append(room)
+        room_count += len(page)
+    return rooms_by_building, room_count
+
+def fetch_catalog(supabase: Client, page_size=CATALOG_PAGE_SIZE):
+    """
+    Fetch buildings and rooms concurrently
+    Returns (buildings, rooms_by_building), or (None, None) if there are no buildings
+    """
+    print("📥 Fetching buildings and rooms from database...")
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        buildings_future = executor.submit(load_buildings, supabase, page_size)
+        rooms_future = executor.submit(load_rooms_by_building, supabase, page_size)
+
+        try:
+            buildings = buildings_future.result()
+            print(f"✅ Found {len(buildings)} buildings in database")
+        except Exception as e:
+            print(f"❌ Error fetching buildings: {e}")
+            return None, None
+
+        try:
+            rooms_by_building, room_count = rooms_future.result()
+            print(f"✅ Found {room_count} rooms across buildings")
+        except Exception as e:
+            print(f"❌ Error fetching rooms: {e}")
+            rooms_by_building = {}
 
     if not buildings:
         print("❌ No buildings found in database. Run seed-database.js first")
-        return
+        return None, None
 
-    print("\n📥 Fetching rooms from database...")
+    return buildings, rooms_by_building
+
+def table_fingerprint(supabase: Client, table):
+    """
+    Row count and latest updated_at of a table, in one request
+    buildings and rooms set updated_at on every update (add_catalog_updated_at_triggers),
+    so in-place edits change the fingerprint as well as inserts and deletes
+    """
+    response = (
+        supabase.table(table)
+        .select('updated_at', count='exact')
+        .order('updated_at', desc=True)
+        .limit(1)
+        .execute()
+    )
+    latest = response.data[0]['updated_at'] if response.data else ''
+    return f"{response.count}:{latest}"
+
+class CatalogCache:
+    """
+    Buildings, rooms and the matching indexes kept between runs of a resident process
+    Each get() costs one small request per table; the tables are downloaded
+    and the BuildingMatcher/AddressLocator rebuilt only when a table's row
+    count or latest updated_at changed
+    """
+
+    def __init__(self, use_match_cache=True):
+        self.use_match_cache = use_match_cache
+        self.fingerprint = None
+        self.buildings = None
+        self.rooms_by_building = None
+        self.matcher = None
+        self.locator = None
+        self.refreshes = 0
+
+    def get(self, supabase: Client):
+        """Returns (buildings, rooms_by_building, matcher, locator), or Nones if there are no buildings"""
+        try:
+            fingerprint = (table_fingerprint(supabase, 'buildings'), table_fingerprint(supabase, 'rooms'))
+        except Exception as e:
+            print(f"⚠️  Could not check the catalog for changes, fetching it: {e}")
+            fingerprint = None
+
+        if fingerprint is not None and fingerprint == self.fingerprint:
+            print(f"✅ Buildings and rooms unchanged, reusing {len(self.buildings)} buildings from memory")
+            run_metrics.count("catalog", "reused")
+            if self.matcher.cache is not None:
+                self.matcher.cache.hits = self.matcher.cache.misses = 0
+            return self.buildings, self.rooms_by_building, self.matcher, self.locator
+
+        buildings, rooms_by_building = fetch_catalog(supabase)
+        if not buildings:
+            return None, None, None, None
+
+        match_cache = None
+        if self.use_match_cache:
+            match_cache = LocationMatchCache(fingerprint=buildings_fingerprint(buildings))
+        self.fingerprint = fingerprint
+        self.buildings = buildings
+        self.rooms_by_building = rooms_by_building
+        self.matcher = BuildingMatcher(buildings, cache=match_cache)
+        self.locator = AddressLocator(buildings, load_address_table())
+        self.refreshes += 1
+        return buildings, rooms_by_building, self.matcher, self.locator
+
+def event_row_fields(event, event_key, content_hash):
+    """Columns of the events row that don't depend on where the event is placed"""
+    links = event.get('links', [])
+    instagram_link = None
+    website_link = None
+    doorlist_link = None
+
+    for link in links:
+        if 'instagram.com' in link:
+            instagram_link = link
+        elif 'doorlist' in link.lower() or 'eventbrite' in link.lower():
+            doorlist_link = link
+        elif not website_link:
+            website_link = link
+
+    custom_links = []
+    for link in links:
+        if link not in [instagram_link, website_link, doorlist_link]:
+            custom_links.append({"name": "Event Link", "url": link})
+
+    return {
+        'title': event['title'],
+        'description': event['description'] or '',
+        'event_date': event['date'],
+        'event_time': event['time_24h'],
+        'category': event['category'],
+        'organization_name': event.get('organization_name') or '',
+        'organization_description': event.get('organization_description') or '',
+        'instagram_link': instagram_link,
+        'website_link': website_link,
+        'doorlist_link': doorlist_link,
+        'custom_links': json.dumps(custom_links) if custom_links else '[]',
+        'created_by': SYSTEM_USER_ID,
+        'event_key': event_key,
+        'content_hash': content_hash,
+        'deleted_at': None
+    }
+
+def build_event_row(event, building, room_name, event_key, content_hash):
+    """Build the events table row for a scraped event placed in building/room"""
+    row = event_row_fields(event, event_key, content_hash)
+    row.update({
+        'location_name': building['name'],
+        'room': room_name,
+        'latitude': float(building['latitude']),
+        'longitude': float(building['longitude']),
+    })
+    return row
+
+def build_rpc_event(event, event_key, content_hash):
+    """An element of the ingest_scraped_events batch; the database picks building and room"""
+    fields = event_row_fields(event, event_key, content_hash)
+    fields['event_date'] = to_iso_date(event['date'])
+    fields['custom_links'] = json.loads(fields['custom_links'])
+    fields['location_query'] = normalize_building_name(event.get('location_name'))
+    fields['room_hint'] = event.get('room')
+    return fields
+
+def prepare_chunk(supabase: Client, chunk, matcher, buildings, scheduler, match_stats, removed_keys,
+                  locator=None, touched_locations=None):
+    """
+    Turn a chunk of scraped events into event rows to upsert
+    Existing events are fetched by the chunk's event keys, and events whose
+    content is unchanged are dropped before matching. Tombstones from an
+    incremental scrape are not written; their keys go to removed_keys. Rooms
+    held by existing events and bookings on the chunk's dates are loaded into
+    the scheduler before any room is assigned. The old and new location of
+    every row are added to touched_locations when given
+    """
+    iso_dates = [to_iso_date(event.get('date')) for event in chunk]
+    event_keys = [event_natural_key(event) for event in chunk if event.get('date') and event.get('title')]
+    run_metrics.count("dedup", "requests")
     try:
-        response = supabase.table('rooms').select('*').execute()
-        rooms = response.data
-        rooms_by_building = {}
-        for room in rooms:
-            building_id = room['building_id']
-            if building_id not in rooms_by_building:
-                rooms_by_building[building_id] = []
-            rooms_by_building[building_id].append(room)
-        print(f"✅ Found {len(rooms)} rooms across buildings")
+        with run_metrics.stage("dedup"):
+            existing_events = fetch_existing_events(supabase, event_keys)
     except Exception as e:
-        print(f"❌ Error fetching rooms: {e}")
-        rooms_by_building = {}
+        run_metrics.count("dedup", "errors")
+        print(f"⚠️  Could not fetch existing events, chunk will be upserted: {e}")
+        existing_events = {}
 
-    print("\n🔄 Matching events to buildings...")
-    events_to_insert = []
-    match_stats = {
-        'high_confidence': 0,
-        'medium_confidence': 0,
-        'low_confidence': 0,
-        'random_assignment': 0,
-        'skipped': 0
-    }
+    with run_metrics.stage("rooms"):
+        scheduler.load_window(supabase, iso_dates)
+
+    existing_hashes = {key: row['content_hash'] for key, row in existing_events.items()}
+    with run_metrics.stage("match"):
+        rows = match_chunk(chunk, existing_hashes, matcher, buildings, scheduler, match_stats, removed_keys,
+                           locator)
+
+    if touched_locations is not None:
+        for row in rows:
+            touched_locations.add(row['location_name'])
+            if row['event_key'] in existing_events:
+                touched_locations.add(existing_events[row['event_key']].get('location_name'))
+    return rows
+
+def fallback_room_name(event, event_key):
+    """Room for a building with no free room in the catalog: the newsletter's, else a stable made-up one"""
+    return event.get('room') or f"Room {100 + stable_hash(ROOM_ASSIGNMENT_SEED, event_key) % 300}"
+
+def match_chunk(chunk, existing_hashes, matcher, buildings, scheduler, match_stats, removed_keys,
+                locator=None):
+    """
+    Drop unchanged events and tombstones, then match the rest to buildings and rooms
+    With a locator, street addresses ("1300 JPA") go to the nearest building
+    before name matching, so an abbreviation in the street name can't be
+    taken for a building; addresses it can't place are matched by name
+    """
+    rows = {}
+    for event in chunk:
+        if event.get('removed'):
+            removed_keys.add(event_natural_key(event))
+            match_stats['removed'] += 1
+            continue
 
-    for i, event in enumerate(scraped_events, 1):
         if not event.get('date') or not event.get('title'):
             match_stats['skipped'] += 1
             continue
 
-        matched_building, confidence = match_building(event.get('location_name'), buildings)
+        event_key = event_natural_key(event)
+        content_hash = event_content_hash(event)
+        if event_key in existing_hashes:
+            if existing_hashes[event_key] == content_hash:
+                match_stats['unchanged'] += 1
+                continue
+            match_stats['changed'] += 1
+
+        location_name = event.get('location_name')
+        nearest = None
+        if locator and parse_street_address(location_name):
+            nearest, _ = locator.locate(location_name)
+        matched_building, confidence = (None, 0) if nearest else matcher.match(location_name)
 
-        if matched_building and confidence >= 0.8:
+        if nearest:
+            building = nearest
+            match_stats['nearest_building'] += 1
+            match_type = "📍 Nearest"
+        elif matched_building and confidence >= 0.8:
             building = matched_building
             match_stats['high_confidence'] += 1
             match_type = "✅ High"
@@ -220,89 +1283,330 @@ def populate_database(events_file="uva_connections_events.json"):
             match_stats['medium_confidence'] += 1
             match_type = "⚠️  Med"
         else:
-            building = get_random_building(buildings)
-            match_stats['random_assignment'] += 1
-            match_type = "🎲 Random"
-
-        building_rooms = rooms_by_building.get(building['id'], [])
-        if building_rooms:
-            room = random.choice(building_rooms)
-            room_name = room['room_name']
-        elif event.get('room'):
-            room_name = event['room']
-        else:
-            room_name = f"Room {random.randint(100, 399)}"
-
-        links = event.get('links', [])
-        instagram_link = None
-        website_link = None
-        doorlist_link = None
-
-        for link in links:
-            if 'instagram.com' in link:
-                instagram_link = link
-            elif 'doorlist' in link.lower() or 'eventbrite' in link.lower():
-                doorlist_link = link
-            elif not website_link:
-                website_link = link
-
-        custom_links = []
-        for link in links:
-            if link not in [instagram_link, website_link, doorlist_link]:
-                custom_links.append({"name": "Event Link", "url": link})
-
-        event_data = {
-            'title': event['title'],
-            'description': event['description'] or '',
-            'location_name': building['name'],
-            'room': room_name,
-            'latitude': float(building['latitude']),
-            'longitude': float(building['longitude']),
-            'event_date': event['date'],
-            'event_time': event['time_24h'],
-            'category': event['category'],
-            'organization_name': event.get('organization_name') or '',
-            'organization_description': event.get('organization_description') or '',
-            'instagram_link': instagram_link,
-            'website_link': website_link,
-            'doorlist_link': doorlist_link,
-            'custom_links': json.dumps(custom_links) if custom_links else '[]',
-            'created_by': '00000000-0000-0000-0000-000000000000'
-        }
+            building, _ = locator.locate(location_name) if locator else (None, None)
+            if building:
+                match_stats['nearest_building'] += 1
+                match_type = "📍 Nearest"
+            else:
+                building = get_random_building(buildings)
+                match_stats['random_assignment'] += 1
+                match_type = "🎲 Random"
 
-        events_to_insert.append(event_data)
+        start, end = event_interval(event)
+        room = scheduler.assign(event_key, building['id'], to_iso_date(event['date']), start, end,
+                                event_min_capacity(event), event.get('room'))
+        room_name = room['room_name'] if room else fallback_room_name(event, event_key)
 
-        if i <= 5:
+        rows[event_key] = build_event_row(event, building, room_name, event_key, content_hash)
+
+        match_stats['processed'] += 1
+        if match_stats['processed'] <= 5:
             print(f"   {match_type} | {event['title'][:40]:<40} -> {building['name']}")
 
+    return list(rows.values())
+
+def ingest_events(supabase: Client, scraped_events, buildings, rooms_by_building,
+                  chunk_size=INSERT_CHUNK_SIZE, use_match_cache=True,
+                  workers=WRITER_WORKERS, rate_limit=WRITER_RATE_LIMIT, soft_delete_removed=False,
+                  matcher=None, locator=None, touched_locations=None):
+    """
+    Stream scraped events through dedup, matching and chunked upserts
+    scraped_events can be any iterable (a generator straight from the scraper);
+    each chunk is handed to the EventWriter pool as soon as it is matched, so
+    the first rows land while upstream is still producing and memory stays
+    bounded by chunk_size x in-flight chunks. Events removed from the source
+    are soft-deleted afterwards when soft_delete_removed is set. A matcher
+    and locator built earlier (CatalogCache) are reused instead of rebuilt.
+    Locations whose events were written or soft-deleted are added to
+    touched_locations when given
+    """
+    print(f"\n🔄 Matching and upserting events (chunks of {chunk_size})...")
+    if matcher is not None:
+        match_cache = matcher.cache
+    else:
+        match_cache = None
+        if use_match_cache:
+            match_cache = LocationMatchCache(fingerprint=buildings_fingerprint(buildings))
+            if match_cache.invalidated:
+                print("   ♻️  Buildings changed since last run, location match cache cleared")
+        matcher = BuildingMatcher(buildings, cache=match_cache)
+    if locator is None:
+        locator = AddressLocator(buildings, load_address_table())
+    scheduler = RoomScheduler(buildings, rooms_by_building)
+    match_stats = {
+        'high_confidence': 0,
+        'medium_confidence': 0,
+        'low_confidence': 0,
+        'nearest_building': 0,
+        'random_assignment': 0,
+        'unchanged': 0,
+        'changed': 0,
+        'skipped': 0,
+        'removed': 0,
+        'soft_deleted': 0,
+        'processed': 0
+    }
+    writer = EventWriter(supabase, workers, rate_limit, on_conflict=EVENT_KEY_CONFLICT)
+    removed_keys = set()
+    written_keys = set()
+
+    try:
+        for chunk in iter_chunks(scraped_events, max(1, chunk_size)):
+            rows = prepare_chunk(supabase, chunk, matcher, buildings, scheduler, match_stats, removed_keys,
+                                 locator, touched_locations)
+            written_keys.update(row['event_key'] for row in rows)
+            writer.submit(rows)
+    finally:
+        insert_result = writer.close()
+
+    # An event whose time changed comes back as a tombstone plus a new event with the same key
+    removed_keys -= written_keys
+    if soft_delete_removed and removed_keys:
+        with run_metrics.stage("soft_delete"):
+            match_stats['soft_deleted'] = soft_delete_events(supabase, removed_keys, chunk_size, touched_locations)
+
+    for key, value in match_stats.items():
+        run_metrics.record("match", key, value)
+    for key, value in scheduler.stats.items():
+        run_metrics.record("rooms", key, value)
+    if match_cache is not None:
+        run_metrics.record("match", "cache_hits", match_cache.hits)
+        run_metrics.record("match", "cache_misses", match_cache.misses)
+    run_metrics.add_time("write", insert_result['elapsed'])
+    for key in ('inserted', 'errors', 'requests', 'retries'):
+        run_metrics.record("write", key, insert_result[key])
+    if insert_result['request_latencies']:
+        run_metrics.record("write", "latency_p50_s", percentile(insert_result['request_latencies'], 50))
+        run_metrics.record("write", "latency_p95_s", percentile(insert_result['request_latencies'], 95))
+
     print(f"\n📊 Matching Statistics:")
     print(f"   High confidence matches: {match_stats['high_confidence']}")
     print(f"   Medium confidence matches: {match_stats['medium_confidence']}")
+    print(f"   Nearest building to address: {match_stats['nearest_building']}")
     print(f"   Random assignments: {match_stats['random_assignment']}")
+    print(f"   Rooms assigned: {scheduler.stats['assigned']} "
+          f"({scheduler.stats['conflicts']} taken rooms skipped, {scheduler.stats['no_free_room']} with no free room)")
+    if match_cache is not None:
+        match_cache.save()
+        print(f"   Location cache hits: {match_cache.hits}")
+        print(f"   Location cache misses: {match_cache.misses}")
+    print(f"   Unchanged since last run: {match_stats['unchanged']}")
+    print(f"   Changed since last run: {match_stats['changed']}")
     print(f"   Skipped (invalid data): {match_stats['skipped']}")
+    if match_stats['removed']:
+        print(f"   Removed from source: {match_stats['removed']}")
+        if soft_delete_removed:
+            print(f"   Soft-deleted: {match_stats['soft_deleted']}")
+        else:
+            print("   (pass --soft-delete-removed to hide removed events)")
 
-    print(f"\n💾 Inserting {len(events_to_insert)} events into database...")
+    if not match_stats['processed']:
+        print("\n✨ Nothing new to write, database is already up to date")
+        return match_stats, insert_result
 
-    inserted_count = 0
-    error_count = 0
+    inserted_count = insert_result['inserted']
 
-    for event_data in events_to_insert:
+    print(f"\n✨ Database population complete!")
+    print(f"📊 Final Summary:")
+    print(f"   Events inserted/updated: {inserted_count}")
+    print(f"   Errors: {insert_result['errors']}")
+    print(f"   Total processed: {match_stats['processed']}")
+    print_write_summary(insert_result)
+
+    if inserted_count > 0:
+        print(f"\n🎉 Success! {inserted_count} events are now available in USpot!")
+
+    return match_stats, insert_result
+
+def ingest_events_rpc(supabase: Client, scraped_events, batch_size=RPC_BATCH_SIZE,
+                      min_similarity=RPC_MIN_SIMILARITY, soft_delete_removed=False):
+    """
+    Ingest scraped events with the ingest_scraped_events database function
+    Building/room matching, dedup against content_hash and the upsert all run
+    in the database, so each batch is one round-trip and the buildings and
+    rooms tables are never downloaded. Returns (stats, insert_result) like
+    ingest_events
+    """
+    print(f"\n🔄 Matching and upserting events in the database (batches of {batch_size})...")
+    stats = Counter()
+    insert_result = new_insert_result()
+    removed_keys = set()
+    written_keys = set()
+    start = time.perf_counter()
+
+    for batch in iter_chunks(scraped_events, max(1, batch_size)):
+        payload = []
+        for event in batch:
+            if event.get('removed'):
+                removed_keys.add(event_natural_key(event))
+                stats['removed'] += 1
+                continue
+            if not event.get('date') or not event.get('title'):
+                stats['skipped'] += 1
+                continue
+            event_key = event_natural_key(event)
+            written_keys.add(event_key)
+            payload.append(build_rpc_event(event, event_key, event_content_hash(event)))
+
+        if not payload:
+            continue
+
+        insert_result['requests'] += 1
+        run_metrics.count("rpc", "requests")
+        request_start = time.perf_counter()
         try:
-            response = supabase.table('events').insert(event_data).execute()
-            inserted_count += 1
+            with run_metrics.stage("rpc"):
+                response = supabase.rpc('ingest_scraped_events', {
+                    'scraped_events': payload,
+                    'min_similarity': min_similarity,
+                }).execute()
+            stats.update(response.data or {})
         except Exception as e:
-            error_count += 1
-            if error_count <= 3:
-                print(f"   ⚠️  Error inserting event '{event_data['title'][:40]}': {str(e)[:80]}")
+            insert_result['errors'] += len(payload)
+            run_metrics.count("rpc", "errors")
+            print(f"❌ Error ingesting a batch of {len(payload)} events: {e}")
+        insert_result['request_latencies'].append(time.perf_counter() - request_start)
+
+    insert_result['inserted'] = stats['inserted'] + stats['updated']
+    insert_result['elapsed'] = time.perf_counter() - start
+
+    removed_keys -= written_keys
+    if soft_delete_removed and removed_keys:
+        with run_metrics.stage("soft_delete"):
+            stats['soft_deleted'] = soft_delete_events(supabase, removed_keys)
+
+    for key, value in stats.items():
+        run_metrics.record("rpc", key, value)
+
+    print(f"\n📊 Matching Statistics (database):")
+    print(f"   Trigram matches: {stats['matched']}")
+    print(f"   Random assignments: {stats['random_assignment']}")
+    print(f"   Unchanged since last run: {stats['unchanged']}")
+    print(f"   Skipped (invalid data): {stats['skipped']}")
+    if stats['removed']:
+        print(f"   Removed from source: {stats['removed']}")
+        if soft_delete_removed:
+            print(f"   Soft-deleted: {stats['soft_deleted']}")
 
     print(f"\n✨ Database population complete!")
     print(f"📊 Final Summary:")
-    print(f"   Events inserted: {inserted_count}")
-    print(f"   Errors: {error_count}")
-    print(f"   Total processed: {len(events_to_insert)}")
+    print(f"   Events inserted: {stats['inserted']}")
+    print(f"   Events updated: {stats['updated']}")
+    print(f"   Errors: {insert_result['errors']}")
+    print_write_summary(insert_result)
 
-    if inserted_count > 0:
-        print(f"\n🎉 Success! {inserted_count} events are now available in USpot!")
+    return stats, insert_result
+
+def publish_building_snapshots(supabase: Client, touched_locations=None):
+    """
+    Ask the database to rebuild the per-building upcoming-events snapshots
+    (refresh_building_snapshots builds them from the events table itself)
+    Buildings named in touched_locations (every building when None) are
+    rebuilt, plus any snapshot whose first day has passed; rows whose content
+    hash is unchanged are not rewritten. Returns a Counter of rebuilt and
+    unchanged counts
+    """
+    names = None if touched_locations is None else sorted(set(touched_locations) - {None})
+    response = supabase.rpc('refresh_building_snapshots', {'building_names': names}).execute()
+    return Counter(response.data or {})
+
+def publish_snapshots_stage(supabase: Client, touched_locations=None):
+    """Run publish_building_snapshots as the publish stage, reporting its counts"""
+    print("\n📰 Publishing per-building upcoming-events snapshots...")
+    try:
+        with run_metrics.stage("publish"):
+            stats = publish_building_snapshots(supabase, touched_locations)
+    except Exception as e:
+        run_metrics.count("publish", "errors")
+        print(f"❌ Could not publish building snapshots: {e}")
+        return None
+
+    for key, value in stats.items():
+        run_metrics.record("publish", key, value)
+    print(f"   Snapshots rebuilt: {stats['rebuilt']}, unchanged: {stats['unchanged']}")
+    return stats
+
+def populate_from_events(scraped_events, chunk_size=INSERT_CHUNK_SIZE, use_match_cache=True,
+                         workers=WRITER_WORKERS, rate_limit=WRITER_RATE_LIMIT, soft_delete_removed=False,
+                         server_match=False, supabase=None, catalog=None, publish_snapshots=False):
+    """
+    Populate database from an iterable of scraped events (used by run-event-pipeline.py)
+    With server_match, matching and writes happen in the database (ingest_events_rpc)
+    A resident process passes its own Supabase client and CatalogCache
+    With publish_snapshots, building snapshots are refreshed once writes finish
+    """
+    if supabase is None:
+        supabase = connect_supabase()
+    if supabase is None:
+        return None
+
+    if server_match:
+        result = ingest_events_rpc(supabase, scraped_events, soft_delete_removed=soft_delete_removed)
+        if publish_snapshots:
+            # The database picked the buildings, so every snapshot is checked
+            publish_snapshots_stage(supabase)
+        return result
+
+    matcher = locator = None
+    with run_metrics.stage("catalog"):
+        if catalog is not None:
+            buildings, rooms_by_building, matcher, locator = catalog.get(supabase)
+        else:
+            buildings, rooms_by_building = fetch_catalog(supabase)
+    if not buildings:
+        return None
+    run_metrics.record("catalog", "buildings", len(buildings))
+    run_metrics.record("catalog", "rooms", sum(len(rooms) for rooms in rooms_by_building.values()))
+
+    touched_locations = set() if publish_snapshots else None
+    result = ingest_events(supabase, scraped_events, buildings, rooms_by_building, chunk_size, use_match_cache,
+                           workers, rate_limit, soft_delete_removed, matcher, locator, touched_locations)
+    if publish_snapshots:
+        publish_snapshots_stage(supabase, touched_locations)
+    return result
+
+def populate_database(events_file="uva_connections_events.json", chunk_size=INSERT_CHUNK_SIZE,
+                      use_match_cache=True, workers=WRITER_WORKERS, rate_limit=WRITER_RATE_LIMIT,
+                      soft_delete_removed=False, server_match=False, publish_snapshots=False):
+    """Main function to populate database with events"""
+    print("🚀 Starting database population...\n")
+
+    if not Path(events_file).exists():
+        print(f"❌ Error: {events_file} not found. Run scrape-connections-events.py first")
+        return
+
+    print(f"📥 Streaming scraped events from {events_file}...")
+    populate_from_events(iter_events_file(events_file), chunk_size, use_match_cache, workers, rate_limit,
+                         soft_delete_removed, server_match, publish_snapshots=publish_snapshots)
 
 if __name__ == "__main__":
-    populate_database()
+    parser = argparse.ArgumentParser(description="Populate USpot database with scraped events")
+    parser.add_argument("events_file", nargs="?", default="uva_connections_events.json",
+                        help="JSON, NDJSON, Parquet or Arrow file produced by scrape-connections-events.py")
+    parser.add_argument("--chunk-size", type=int, default=INSERT_CHUNK_SIZE,
+                        help="Number of events sent per insert request (1 = one request per event)")
+    parser.add_argument("--no-match-cache", action="store_true",
+                        help="Ignore and do not update the on-disk location match cache")
+    parser.add_argument("--workers", type=int, default=WRITER_WORKERS,
+                        help="Concurrent write requests")
+    parser.add_argument("--rate-limit", type=float, default=WRITER_RATE_LIMIT,
+                        help="Maximum write requests per second across workers (0 = unlimited)")
+    parser.add_argument("--soft-delete-removed", action="store_true",
+                        help="Set deleted_at on events an incremental scrape reports as removed")
+    parser.add_argument("--server-match", action="store_true",
+                        help="Match and upsert in the database with ingest_scraped_events (one request per "
+                             "batch); rooms are picked at random, ignoring capacity and bookings")
+    parser.add_argument("--publish-snapshots", action="store_true",
+                        help="After writing, refresh the per-building upcoming-events snapshots")
+    parser.add_argument("--report", metavar="PATH",
+                        help=f"Write per-stage run metrics to PATH (.json, or .prom for Prometheus; "
+                             f"default ${run_metrics.REPORT_ENV_VAR})")
+    args = parser.parse_args()
+
+    with run_metrics.profiled():
+        populate_database(args.events_file, chunk_size=args.chunk_size,
+                          use_match_cache=not args.no_match_cache,
+                          workers=args.workers, rate_limit=args.rate_limit,
+                          soft_delete_removed=args.soft_delete_removed,
+                          server_match=args.server_match, publish_snapshots=args.publish_snapshots)
+    run_metrics.write_report(args.report)
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Run the UVA Connections scrape -> match -> write pipeline in one process
+Events stream from the scraper through building matching into chunked upserts,
+without the intermediate uva_connections_events.json round-trip. Runs are
+incremental: only events that changed since the last successful run (and
+removals) are sent downstream; --force does a full run. With --daemon the
+pipeline runs on an interval in one resident process
+"""
+
+import argparse
+import importlib.util
+import json
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+def load_script(filename):
+    """Import a sibling script with a hyphenated file name as a module"""
+    module_name = Path(filename).stem.replace('-', '_')
+    spec = importlib.util.spec_from_file_location(module_name, Path(__file__).parent / filename)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+import run_metrics
+
+scraper = load_script("scrape-connections-events.py")
+populator = load_script("populate-events-database.py")
+
+DAEMON_INTERVAL_MINUTES = 60
+
+STATUS_FILE = Path(__file__).parent / 'pipeline_status.json'
+
+def tap_ndjson(events, path):
+    """Pass events through unchanged while writing each one as a line of NDJSON"""
+    with open(path, 'w', encoding='utf-8') as f:
+        for event in events:
+            f.write(json.dumps(event.to_dict(), ensure_ascii=False) + "\n")
+            f.flush()
+            yield event
+    print(f"💾 Wrote scraped events to {path}")
+
+def run_pipeline(force=False, parser=None, sources=None, ndjson_tap=None,
+                 chunk_size=populator.INSERT_CHUNK_SIZE, use_match_cache=True,
+                 workers=populator.WRITER_WORKERS, rate_limit=populator.WRITER_RATE_LIMIT,
+                 soft_delete_removed=False, server_match=False, publish_snapshots=False, session=None,
+                 supabase=None, catalog=None, **source_options):
+    """
+    Scrape and populate in one pass
+    The page cache and scraper state are only saved once every write
+    succeeded, so failed events are retried on the next run. session,
+    supabase and catalog are reused across runs by run_daemon
+    Returns False if the page was unchanged and nothing ran
+    """
+    print("🚀 Starting UVA Connections event pipeline\n")
+
+    state = scraper.IncrementalState(full=force)
+    page_cache = {}
+    events = scraper.iter_scraped_events(force=force, parser=parser, sources=sources, state=state,
+                                         session=session, page_cache=page_cache, **source_options)
+    if events is None:
+        print("\n✨ Connections page unchanged since last run, nothing to do")
+        return False
+
+    if ndjson_tap:
+        events = tap_ndjson(events, ndjson_tap)
+
+    result = populator.populate_from_events(events, chunk_size=chunk_size, use_match_cache=use_match_cache,
+                                            workers=workers, rate_limit=rate_limit,
+                                            soft_delete_removed=soft_delete_removed,
+                                            server_match=server_match, supabase=supabase, catalog=catalog,
+                                            publish_snapshots=publish_snapshots)
+    if result is not None and not result[1]['errors']:
+        if page_cache:
+            scraper.save_page_cache(page_cache)
+        state.save()
+        print(f"💾 Saved scraper state ({state.summary()})")
+    else:
+        print("⚠️  Scraper state not saved, the next run will resend these events")
+    return True
+
+def run_daemon(interval_minutes=DAEMON_INTERVAL_MINUTES, status_file=STATUS_FILE, report=None, force=False,
+               use_match_cache=True, **pipeline_options):
+    """
+    Run the pipeline every interval_minutes in this process until interrupted
+    The HTTP session, Supabase client and building/room catalog (with the
+    matcher and locator built from it) are kept between runs; the catalog is
+    downloaded again only when the tables change. After each run the run
+    report plus outcome and next run time are written to status_file
+    """
+    print(f"🔁 Running the pipeline every {interval_minutes:g} minutes (Ctrl+C to stop)")
+    print(f"   Status: {status_file}\n")
+    session = scraper.requests.Session()
+    catalog = populator.CatalogCache(use_match_cache=use_match_cache)
+    supabase = None
+    runs = 0
+
+    try:
+        while True:
+            run_metrics.reset()
+            started = time.monotonic()
+            runs += 1
+            try:
+                if supabase is None:
+                    supabase = populator.connect_supabase()
+                if supabase is None:
+                    outcome = "error: Supabase is not configured"
+                else:
+                    ran = run_pipeline(force=force and runs == 1, use_match_cache=use_match_cache,
+                                       session=session, supabase=supabase, catalog=catalog, **pipeline_options)
+                    outcome = "ok" if ran else "unchanged"
+            except Exception as e:
+                outcome = f"error: {e}"
+                print(f"❌ Pipeline run failed: {e}")
+
+            wait = max(0.0, interval_minutes * 60 - (time.monotonic() - started))
+            status = {
+                'outcome': outcome,
+                'runs': runs,
+                'catalog_refreshes': catalog.refreshes,
+                'next_run_at': (datetime.now(timezone.utc) + timedelta(seconds=wait)).isoformat(),
+            }
+            run_metrics.write_report(status_file, extra=status, quiet=True)
+            run_metrics.write_report(report)
+            print(f"\n💤 Run {runs}: {outcome}, next run in {wait / 60:.1f} minutes\n")
+            time.sleep(wait)
+    except KeyboardInterrupt:
+        print("\n👋 Stopping the pipeline daemon")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scrape UVA Connections events and populate the USpot database")
+    parser.add_argument("--force", action="store_true",
+                        help="Ignore the page cache and scraper state and resend every event")
+    parser.add_argument("--parser", choices=scraper.PARSER_CHOICES, default="auto",
+                        help="HTML parser backend (auto uses lxml when installed)")
+    parser.add_argument("--source", action="append", choices=sorted(scraper.SOURCE_REGISTRY),
+                        help="Scrape these registered sources concurrently (repeatable)")
+    parser.add_argument("--source-url", help="Page URL for sources that take one")
+    parser.add_argument("--issue", action="append", default=[],
+                        help="Archived issue number for connections-archive (repeatable)")
+    parser.add_argument("--anchor", action="append", default=[],
+                        help="Newsletter #anchor for connections-archive (repeatable)")
+    parser.add_argument("--year", type=int, default=2025, help="Year for dates without one")
+    parser.add_argument("--per-host", type=int, default=scraper.PER_HOST_CONCURRENCY,
+                        help="Concurrent requests allowed per host")
+    parser.add_argument("--ndjson-tap", metavar="PATH",
+                        help="Also write every scraped event to PATH as NDJSON")
+    parser.add_argument("--chunk-size", type=int, default=populator.INSERT_CHUNK_SIZE,
+                        help="Number of events sent per upsert request")
+    parser.add_argument("--no-match-cache", action="store_true",
+                        help="Ignore and do not update the on-disk location match cache")
+    parser.add_argument("--workers", type=int, default=populator.WRITER_WORKERS,
+                        help="Concurrent write requests")
+    parser.add_argument("--rate-limit", type=float, default=populator.WRITER_RATE_LIMIT,
+                        help="Maximum write requests per second across workers (0 = unlimited)")
+    parser.add_argument("--soft-delete-removed", action="store_true",
+                        help="Set deleted_at on events that disappeared from their source")
+    parser.add_argument("--server-match", action="store_true",
+                        help="Match and upsert in the database with ingest_scraped_events (one request per "
+                             "batch); rooms are picked at random, ignoring capacity and bookings")
+    parser.add_argument("--publish-snapshots", action="store_true",
+                        help="After writing, refresh the per-building upcoming-events snapshots")
+    parser.add_argument("--report", metavar="PATH",
+                        help=f"Write per-stage run metrics to PATH (.json, or .prom for Prometheus; "
+                             f"default ${run_metrics.REPORT_ENV_VAR})")
+    parser.add_argument("--daemon", action="store_true",
+                        help="Keep running, repeating the pipeline every --interval minutes")
+    parser.add_argument("--interval", type=float, default=DAEMON_INTERVAL_MINUTES,
+                        help="Minutes between --daemon runs")
+    parser.add_argument("--status-file", default=STATUS_FILE,
+                        help="Where --daemon writes the last run's timings and outcome")
+    args = parser.parse_args()
+
+    if args.daemon:
+        run_daemon(
+            args.interval, args.status_file, report=args.report, force=args.force,
+            use_match_cache=not args.no_match_cache, parser=args.parser, sources=args.source,
+            ndjson_tap=args.ndjson_tap, chunk_size=args.chunk_size, workers=args.workers,
+            rate_limit=args.rate_limit, soft_delete_removed=args.soft_delete_removed,
+            server_match=args.server_match, publish_snapshots=args.publish_snapshots, per_host=args.per_host,
+            url=args.source_url, issues=args.issue, anchors=args.anchor, year=args.year,
+        )
+        sys.exit(0)
+
+    with run_metrics.profiled():
+        run_pipeline(
+            force=args.force, parser=args.parser, sources=args.source, ndjson_tap=args.ndjson_tap,
+            chunk_size=args.chunk_size, use_match_cache=not args.no_match_cache,
+            workers=args.workers, rate_limit=args.rate_limit, soft_delete_removed=args.soft_delete_removed,
+            server_match=args.server_match, publish_snapshots=args.publish_snapshots, per_host=args.per_host,
+            url=args.source_url, issues=args.issue, anchors=args.anchor, year=args.year,
+        )
+    run_metrics.write_report(args.report)
@@ -15,22 +15,12 @@ fi
 echo "✅ Dependencies installed"
 echo ""
 
-echo "Step 1: Scraping events from UVA Connections..."
-echo "------------------------------------------------"
-python3 scrape-connections-events.py
-
-if [ $? -ne 0 ]; then
-    echo "❌ Error scraping events"
-    exit 1
-fi
-
-echo ""
-echo "Step 2: Populating database with events..."
+echo "Scraping events and populating database..."
 echo "-------------------------------------------"
-python3 populate-events-database.py
+python3 run-event-pipeline.py "$@"
 
 if [ $? -ne 0 ]; then
-    echo "❌ Error populating database"
+    echo "❌ Error running event pipeline"
     exit 1
 fi
 
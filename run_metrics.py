@@ -0,0 +1,163 @@
+"""
+Per-stage run metrics for the event pipeline scripts
+Stages (fetch, parse, catalog, dedup, match, write) record wall time, call
+counts and counters such as events, cache hits, requests and errors. One
+report per run is written as JSON, or as a Prometheus textfile when the path
+ends in .prom (for node_exporter's textfile collector).
+
+Set USPOT_RUN_REPORT=path to write a report without passing --report, and
+USPOT_PROFILE=path.prof to run under cProfile and dump the stats there.
+"""
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import re
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+REPORT_ENV_VAR = "USPOT_RUN_REPORT"
+PROFILE_ENV_VAR = "USPOT_PROFILE"
+PROFILE_TOP_FUNCTIONS = 15
+
+_lock = threading.Lock()
+_stages = {}
+_started_at = datetime.now(timezone.utc)
+_started = time.perf_counter()
+
+def _get_stage(name):
+    return _stages.setdefault(name, {'wall_s': 0.0, 'calls': 0, 'counters': {}})
+
+@contextmanager
+def stage(name):
+    """
+    Time a block as one call of stage name
+    Time from overlapping calls (worker threads, concurrent fetches) is summed
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        with _lock:
+            entry = _get_stage(name)
+            entry['wall_s'] += elapsed
+            entry['calls'] += 1
+
+def add_time(name, seconds):
+    """Add time measured elsewhere (e.g. the writer pool's lifetime) to a stage"""
+    with _lock:
+        entry = _get_stage(name)
+        entry['wall_s'] += seconds
+        entry['calls'] += 1
+
+def count(name, key, n=1):
+    """Increment a counter of stage name"""
+    with _lock:
+        counters = _get_stage(name)['counters']
+        counters[key] = counters.get(key, 0) + n
+
+def record(name, key, value):
+    """Set a value (latency percentile, queue size, ...) on stage name"""
+    with _lock:
+        _get_stage(name)['counters'][key] = value
+
+def reset():
+    """Start a new run (used when several runs share one process)"""
+    global _started_at, _started
+    with _lock:
+        _stages.clear()
+        _started_at = datetime.now(timezone.utc)
+        _started = time.perf_counter()
+
+def report():
+    """The run so far as a dict; error_rate is errors / requests where both are counted"""
+    with _lock:
+        stages = {}
+        for name, entry in _stages.items():
+            data = {'wall_s': round(entry['wall_s'], 6), 'calls': entry['calls']}
+            data.update(entry['counters'])
+            if entry['counters'].get('requests'):
+                data['error_rate'] = round(entry['counters'].get('errors', 0) / entry['counters']['requests'], 6)
+            stages[name] = data
+        return {
+            'started_at': _started_at.isoformat(),
+            'duration_s': round(time.perf_counter() - _started, 6),
+            'stages': stages,
+        }
+
+def prometheus_text(run_report, prefix="uspot_pipeline"):
+    """Render a report in the Prometheus text exposition format"""
+    lines = [
+        f"# TYPE {prefix}_duration_seconds gauge",
+        f"{prefix}_duration_seconds {run_report['duration_s']}",
+        f"# TYPE {prefix}_last_run_timestamp_seconds gauge",
+        f"{prefix}_last_run_timestamp_seconds {datetime.fromisoformat(run_report['started_at']).timestamp():.0f}",
+    ]
+    metrics = {}
+    for stage_name, data in run_report['stages'].items():
+        for key, value in data.items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            metric = f"{prefix}_stage_{re.sub(r'[^a-zA-Z0-9_]', '_', key)}"
+            if key == 'wall_s':
+                metric = f"{prefix}_stage_wall_seconds"
+            metrics.setdefault(metric, []).append(f'{metric}{{stage="{stage_name}"}} {value}')
+    for metric, samples in metrics.items():
+        lines.append(f"# TYPE {metric} gauge")
+        lines.extend(samples)
+    return "\n".join(lines) + "\n"
+
+def write_report(path=None, extra=None, quiet=False):
+    """
+    Write the run report to path (or $USPOT_RUN_REPORT), with extra top-level fields
+    Returns the path written, or None if no report was requested
+    """
+    path = path or os.environ.get(REPORT_ENV_VAR)
+    if not path:
+        return None
+
+    run_report = report()
+    run_report.update(extra or {})
+    path = Path(path)
+    try:
+        # Write then rename, so readers (the textfile collector, a status
+        # check) never see a partial file
+        tmp_path = path.with_suffix(path.suffix + '.tmp')
+        if path.suffix == '.prom':
+            tmp_path.write_text(prometheus_text(run_report), encoding='utf-8')
+        else:
+            tmp_path.write_text(json.dumps(run_report, indent=2) + "\n", encoding='utf-8')
+        tmp_path.replace(path)
+    except OSError as e:
+        print(f"⚠️  Could not write run report: {e}")
+        return None
+
+    if not quiet:
+        print(f"📈 Run report written to {path}")
+    return path
+
+@contextmanager
+def profiled():
+    """Run the block under cProfile when $USPOT_PROFILE is set, dumping stats to that path"""
+    path = os.environ.get(PROFILE_ENV_VAR)
+    if not path:
+        yield
+        return
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(path)
+        summary = io.StringIO()
+        pstats.Stats(profiler, stream=summary).sort_stats('cumulative').print_stats(PROFILE_TOP_FUNCTIONS)
+        print(f"\n🔬 Profile written to {path} (top {PROFILE_TOP_FUNCTIONS} by cumulative time):")
+        print(summary.getvalue())
@@ -5,15 +5,46 @@ Scrapes events from the UVA Connections newsletter and populates the USpot datab
 """
 
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, CData, NavigableString, Tag
+import argparse
+import asyncio
+import hashlib
+import random
 import re
 import json
-from datetime import datetime
+import queue
+import threading
+import time
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+from functools import lru_cache
 import os
 from pathlib import Path
+from urllib.parse import urldefrag, urlparse
+
+import run_metrics
+from event_records import EventRecord, write_events
+
+try:
+    import lxml.html
+    from lxml import etree
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+try:
+    import httpx
+    HAS_HTTPX = True
+except ImportError:
+    HAS_HTTPX = False
 
 URL = "https://studentaffairs.virginia.edu/connections#1a"
 
+PAGE_CACHE_FILE = Path(__file__).parent / 'connections_page_cache.json'
+
+EVENT_STATE_FILE = Path(__file__).parent / 'scraped_events_state.json'
+
 MONTH_MAP = {
     "Jan": 1, "Jan.": 1,
     "Feb": 2, "Feb.": 2,
@@ -35,6 +66,108 @@ DATE_LINE_REGEX = re.compile(
 
 SECTION_TITLES = {"ENGAGE", "LEARN", "BE WELL", "ARTS", "TALKS"}
 
+NON_DIGIT_REGEX = re.compile(r'\D')
+
+TIME_RANGE_SEPARATOR_REGEX = re.compile(r'[–—-]')
+
+CLOCK_TIME_REGEX = re.compile(r'(\d{1,2})(?::(\d{2}))?\s*(a\.?m\.?|p\.?m\.?)')
+
+# A range start with no a.m./p.m. of its own, as in "6 – 8:30 p.m."
+BARE_CLOCK_TIME_REGEX = re.compile(r'(\d{1,2})(?::(\d{2}))?')
+
+ROOM_NUMBER_REGEX = re.compile(r"^\d+[A-Za-z]?$")
+
+LOCATION_ROOM_KEYWORDS = ["Room", "Hall", "Theater", "Theatre"]
+
+DEFAULT_TIME_24H = "12:00:00"
+
+# Result of normalize_event_lines for one date/time/location line
+EventLineFields = namedtuple(
+    "EventLineFields", ["date", "time", "time_24h", "end_time_24h", "location", "building", "room"]
+)
+
+# Keyword groups for classify_categories; keywords match at the start of a word
+CATEGORY_KEYWORDS = {
+    "food": ["pizza", "bodo", "bagel", "food", "lunch", "dinner", "snacks", "feast"],
+    "free": ["free", "no cost", "provided"],
+    "sports": ["5k", "run", "race", "game", "tournament", "intramural", "sports"],
+    "arts": ["concert", "showcase", "performance", "ensemble", "dance", "arts", "a cappella", "theater", "music"],
+    "social": ["party", "social", "mixer", "movie"],
+    "club": ["club", "council", "association", "student org", "@ uva", "at uva"],
+}
+
+# (category, alternatives): the category applies if every group of any alternative was seen
+CATEGORY_RULES = [
+    ("Free Food", [{"food", "free"}]),
+    ("Sports", [{"sports"}]),
+    ("Arts", [{"arts"}]),
+    ("Entertainment", [{"arts"}, {"social"}]),
+    ("Club Events", [{"club"}]),
+]
+
+CATEGORY_KEYWORD_GROUPS = {
+    keyword: group for group, keywords in CATEGORY_KEYWORDS.items() for keyword in keywords
+}
+
+def keyword_trie_pattern(keywords):
+    """
+    Regex source matching any of keywords, factored into a character trie
+    ("bagel|bodo" -> "b(?:agel|odo)") so the engine never re-tries shared prefixes
+    """
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node):
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+CATEGORY_KEYWORD_REGEX = re.compile(r"(?<![a-z0-9])" + keyword_trie_pattern(CATEGORY_KEYWORD_GROUPS))
+
+ORG_NAME_PATTERNS = [
+    re.compile(r"([A-Z][A-Za-z0-9 '&]+ @ UVA)"),
+    re.compile(r"([A-Z][A-Za-z0-9 '&]+ at UVA)"),
+]
+
+ORG_TITLE_CHOP_WORDS = ["Showcase", "Concert", "Competition", "Event", "Workshop"]
+
+# Elements whose text BeautifulSoup's get_text() leaves out
+NON_TEXT_TAGS = {"script", "style", "template", "rt", "rp"}
+
+PARSER_CHOICES = ["auto", "lxml", "html.parser"]
+
+# Archived newsletter issues by number (--issue); {issue} is the issue number
+CONNECTIONS_ISSUE_URL = "https://studentaffairs.virginia.edu/connections/{issue}"
+
+# Archived newsletter issues by publication date (--backfill); {issue_date} is
+# the date in ISSUE_DATE_SLUG_FORMAT
+CONNECTIONS_ISSUE_DATE_URL = "https://studentaffairs.virginia.edu/connections/archive/{issue_date}"
+
+# --backfill: issues go out weekly on this weekday (Monday = 0)
+CONNECTIONS_ISSUE_WEEKDAY = 0
+
+ISSUE_DATE_SLUG_FORMAT = "%Y-%m-%d"
+
+REQUEST_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (compatible; UVA-Connections-Scraper/1.0)"
+}
+
+PER_HOST_CONCURRENCY = 2
+
+FETCH_RETRIES = 3
+
+RETRY_BACKOFF_SECONDS = 1.0
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
 def load_env():
     """Load environment variables from .env file"""
     env_path = Path(__file__).parent / '.env'
@@ -61,27 +194,13 @@ def parse_date_time_location(line, default_year=None):
     """
     if default_year is None:
         default_year = datetime.now().year
+    return _parse_date_time_location(line, default_year)
 
+@lru_cache(maxsize=4096)
+def _parse_date_time_location(line, default_year):
     parts = [p.strip() for p in line.split(",")]
 
-    if not parts:
-        return None, None, None
-
-    date_part = parts[0]
-    date_part = date_part.split("–")[0].strip()
-
-    try:
-        month_str, day_str = date_part.split()[:2]
-        month = MONTH_MAP.get(month_str.rstrip("."), None)
-        day_str = re.sub(r'\D', '', day_str)
-        day = int(day_str) if day_str.isdigit() and month else None
-
-        date_str = None
-        if month and day:
-            date_obj = datetime(default_year, month, day)
-            date_str = date_obj.strftime("%m/%d/%Y")
-    except (ValueError, IndexError):
-        date_str = None
+    date_str = _date_string(parts[0].split("–")[0].strip(), default_year)
 
     time_str = None
     if len(parts) >= 2 and ("a.m." in parts[1].lower() or "p.m." in parts[1].lower()):
@@ -93,6 +212,24 @@ def parse_date_time_location(line, default_year=None):
 
     return date_str, time_str, location_str
 
+@lru_cache(maxsize=1024)
+def _date_string(date_part, year):
+    """ "Nov. 16" -> "11/16/<year>", None if the month/day are not a valid date"""
+    tokens = date_part.split()[:2]
+    if len(tokens) < 2:
+        return None
+
+    month = MONTH_MAP.get(tokens[0].rstrip("."))
+    day_str = NON_DIGIT_REGEX.sub('', tokens[1])
+    if not month or not day_str:
+        return None
+
+    try:
+        return datetime(year, month, int(day_str)).strftime("%m/%d/%Y")
+    except ValueError:
+        return None
+
+@lru_cache(maxsize=4096)
 def split_location(location_str):
     """
     Split location into building name and room
@@ -105,17 +242,15 @@ def split_location(location_str):
 
     loc = location_str.strip()
 
-    keywords = ["Room", "Hall", "Theater", "Theatre"]
-    for kw in keywords:
-        if kw in loc:
-            idx = loc.index(kw)
+    for kw in LOCATION_ROOM_KEYWORDS:
+        idx = loc.find(kw)
+        if idx != -1:
             building = loc[:idx].strip(" ,")
-            room = loc[idx:].strip()
             if building:
-                return building, room
+                return building, loc[idx:].strip()
 
     tokens = loc.split()
-    if tokens and re.match(r"^\d+[A-Za-z]?$", tokens[-1]):
+    if tokens and ROOM_NUMBER_REGEX.match(tokens[-1]):
         room = tokens[-1]
         building = " ".join(tokens[:-1]).strip(" ,")
         return building or None, room
@@ -123,44 +258,33 @@ def split_location(location_str):
     return loc, None
 
 def classify_categories(title, description):
-    """Map event to USpot categories"""
+    """
+    Map event to USpot categories in a single pass over the text
+    Returns the full category list, always starting with "Campus Events"
+    """
     text = f"{title} {description}".lower()
-    cats = []
-
-    cats.append("Campus Events")
-
-    if any(word in text for word in ["pizza", "bodo", "bagel", "food", "lunch", "dinner", "snacks", "feast"]):
-        if "free" in text or "no cost" in text or "provided" in text:
-            cats.append("Free Food")
-
-    if any(word in text for word in ["5k", "run", "race", "game", "tournament", "intramural", "sports"]):
-        cats.append("Sports")
-
-    if any(word in text for word in ["concert", "showcase", "performance", "ensemble", "dance", "arts", "a cappella", "theater", "music"]):
-        cats.append("Arts")
-        cats.append("Entertainment")
-    elif any(word in text for word in ["party", "social", "mixer", "movie"]):
-        cats.append("Entertainment")
-
-    if any(word in text for word in ["club", "council", "association", "student org", "@ uva", "at uva"]):
-        cats.append("Club Events")
+    groups = frozenset(map(CATEGORY_KEYWORD_GROUPS.__getitem__, CATEGORY_KEYWORD_REGEX.findall(text)))
+    return list(categories_for_groups(groups))
 
-    return cats[0] if cats else "Campus Events"
+@lru_cache(maxsize=None)
+def categories_for_groups(groups):
+    """Apply CATEGORY_RULES to a set of seen keyword groups (few distinct sets, so memoized)"""
+    cats = ["Campus Events"]
+    for category, alternatives in CATEGORY_RULES:
+        if any(required <= groups for required in alternatives):
+            cats.append(category)
+    return tuple(cats)
 
 def guess_org_name(title, description):
     """Extract organization name from title or description"""
-    m = re.search(r"([A-Z][A-Za-z0-9 '&]+ @ UVA)", description)
-    if m:
-        return m.group(1)
-
-    m = re.search(r"([A-Z][A-Za-z0-9 '&]+ at UVA)", description)
-    if m:
-        return m.group(1)
+    for pattern in ORG_NAME_PATTERNS:
+        m = pattern.search(description)
+        if m:
+            return m.group(1)
 
     if "UVA" in title:
-        chop_words = ["Showcase", "Concert", "Competition", "Event", "Workshop"]
         part = title
-        for w in chop_words:
+        for w in ORG_TITLE_CHOP_WORDS:
             idx = part.find(w)
             if idx != -1:
                 part = part[:idx]
@@ -179,18 +303,33 @@ def org_description_from_text(description):
 def convert_time_to_24h(time_str):
     """
     Convert time string like "12 p.m." or "6 – 8:30 p.m." to 24-hour format
-    Returns the start time in HH:MM:SS format
+    Returns the start time in HH:MM:SS format ("18:00:00" for the range)
     """
-    if not time_str:
-        return "12:00:00"
+    return convert_time_range_to_24h(time_str)[0]
 
-    time_str = time_str.lower().strip()
+@lru_cache(maxsize=1024)
+def convert_time_range_to_24h(time_str):
+    """
+    Convert a time or time range to 24-hour (start, end)
+    Example: "9 a.m. – 3 p.m." -> ("09:00:00", "15:00:00"); end is None without a range
+    A start with no a.m./p.m. of its own takes the end's: "6 – 8:30 p.m." ->
+    ("18:00:00", "20:30:00"), but "11 – 1 p.m." -> ("11:00:00", "13:00:00")
+    """
+    if not time_str:
+        return DEFAULT_TIME_24H, None
 
-    time_str = re.sub(r'[–—-].*', '', time_str).strip()
+    start_part, *rest = TIME_RANGE_SEPARATOR_REGEX.split(time_str.lower().strip(), maxsplit=1)
+    start = _clock_time_24h(start_part.strip())
+    end = _clock_time_24h(rest[0].strip()) if rest else None
+    if start is None and end is not None:
+        start = _range_start_24h(start_part.strip(), end)
+    return start or DEFAULT_TIME_24H, end
 
-    match = re.search(r'(\d{1,2})(?::(\d{2}))?\s*(a\.?m\.?|p\.?m\.?)', time_str)
+def _clock_time_24h(text):
+    """First "8:30 p.m."-style time in text as HH:MM:SS, None if there is none"""
+    match = CLOCK_TIME_REGEX.search(text)
     if not match:
-        return "12:00:00"
+        return None
 
     hour = int(match.group(1))
     minute = int(match.group(2)) if match.group(2) else 0
@@ -203,109 +342,824 @@ def convert_time_to_24h(time_str):
 
     return f"{hour:02d}:{minute:02d}:00"
 
-def scrape_events():
-    """Scrape events from UVA Connections page"""
-    print("🌐 Fetching UVA Connections page...")
+def _range_start_24h(text, end):
+    """
+    A bare range start ("6", "8:30") as HH:MM:SS in the same half of the day
+    as end, or in the other half when that would put it after end
+    """
+    match = BARE_CLOCK_TIME_REGEX.search(text)
+    if not match:
+        return None
+
+    hour = int(match.group(1)) % 12
+    minute = int(match.group(2)) if match.group(2) else 0
+    end_hour = int(end[:2])
+    if end_hour >= 12:
+        hour += 12
+    start = f"{hour:02d}:{minute:02d}:00"
+    if start > end:
+        start = f"{(hour + 12) % 24:02d}:{minute:02d}:00"
+    return start
+
+def normalize_event_lines(lines, default_year=None):
+    """
+    Normalize a batch of date/time/location lines in one pass
+    Returns one EventLineFields per line, with the same date, time, 24h time
+    and building/room split as the per-event functions, plus the end time of
+    ranges. The default year is resolved once per batch and repeated dates,
+    times and locations come from memoized lookups.
+    """
+    if default_year is None:
+        default_year = datetime.now().year
+
+    normalized = []
+    for line in lines:
+        date_str, time_str, location_str = _parse_date_time_location(line, default_year)
+        time_24h, end_time_24h = convert_time_range_to_24h(time_str)
+        building, room = split_location(location_str)
+        normalized.append(EventLineFields(date_str, time_str, time_24h, end_time_24h, location_str, building, room))
+    return normalized
+
+def load_page_cache(cache_file=PAGE_CACHE_FILE):
+    """Load cached page body and validators, or empty dict if there is no usable cache"""
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def save_page_cache(cache, cache_file=PAGE_CACHE_FILE):
+    """Persist page body, ETag/Last-Modified and body hash for the next run"""
+    try:
+        with open(cache_file, 'w', encoding='utf-8') as f:
+            json.dump(cache, f, ensure_ascii=False)
+    except OSError as e:
+        print(f"⚠️  Could not save page cache: {e}")
+
+def fetch_page(url, headers, cache_file=PAGE_CACHE_FILE, force=False, session=None):
+    """
+    Fetch page with a conditional request against the local page cache
+    Returns (html, changed, cache_entry); changed is False on a 304 or an
+    identical body. The cache is not updated here: pass cache_entry to
+    save_page_cache once the page's events are safely stored, so a failed
+    run fetches and parses the page again (cache_entry is None on a 304)
+    Pass a requests.Session to keep the connection alive between calls
+    Raises requests.exceptions.RequestException on network/HTTP errors
+    """
+    cache = load_page_cache(cache_file)
+    if cache.get('url') != url:
+        cache = {}
+
+    request_headers = dict(headers)
+    if cache and not force:
+        if cache.get('etag'):
+            request_headers['If-None-Match'] = cache['etag']
+        if cache.get('last_modified'):
+            request_headers['If-Modified-Since'] = cache['last_modified']
 
-    headers = {
-        "User-Agent": "Mozilla/5.0 (compatible; UVA-Connections-Scraper/1.0)"
+    resp = (session or requests).get(url, headers=request_headers, timeout=30)
+    if resp.status_code == 304 and cache.get('body') is not None:
+        return cache['body'], False, None
+    resp.raise_for_status()
+
+    body = resp.text
+    body_hash = hashlib.sha256(body.encode('utf-8')).hexdigest()
+    changed = force or body_hash != cache.get('body_sha256')
+
+    cache_entry = {
+        'url': url,
+        'etag': resp.headers.get('ETag'),
+        'last_modified': resp.headers.get('Last-Modified'),
+        'body_sha256': body_hash,
+        'body': body,
     }
+    return body, changed, cache_entry
+
+def resolve_parser(parser=None):
+    """Pick the parser backend: lxml when installed, html.parser otherwise"""
+    if parser in (None, "auto"):
+        return "lxml" if HAS_LXML else "html.parser"
+    if parser == "lxml" and not HAS_LXML:
+        print("⚠️  lxml not installed, falling back to html.parser")
+        return "html.parser"
+    return parser
+
+def _walk_lxml(element):
+    """
+    Yield ("text", str), ("a_start", href) and ("a_end", None) for an lxml tree
+    in document order, skipping the same strings BeautifulSoup's get_text() skips
+    """
+    skip_depth = 0
+
+    for action, node in etree.iterwalk(element, events=("start", "end", "comment", "pi")):
+        if action in ("comment", "pi"):
+            # Comment and processing instruction text is not page text, their tail is
+            if node.tail and not skip_depth:
+                yield "text", node.tail
+        elif action == "start":
+            if node.tag in NON_TEXT_TAGS:
+                skip_depth += 1
+            if skip_depth:
+                continue
+            if node.tag == "a":
+                yield "a_start", node.get("href")
+            if node.text:
+                yield "text", node.text
+        else:
+            if node.tag in NON_TEXT_TAGS:
+                skip_depth -= 1
+            elif node.tag == "a" and not skip_depth:
+                yield "a_end", None
+            if node is not element and node.tail and not skip_depth:
+                yield "text", node.tail
+
+def _walk_bs4(element):
+    """Same event stream as _walk_lxml for a BeautifulSoup tree"""
+    for child in element.children:
+        if isinstance(child, Tag):
+            if child.name == "a":
+                yield "a_start", child.get("href")
+                yield from _walk_bs4(child)
+                yield "a_end", None
+            else:
+                yield from _walk_bs4(child)
+        elif type(child) in (NavigableString, CData):
+            yield "text", child
 
+def iter_page_nodes(html, parser=None, anchor=None):
+    """
+    Parse html with the chosen backend and walk its <main> element in one pass
+    With anchor, only the element with that id is walked (if it exists)
+    """
+    if resolve_parser(parser) == "lxml":
+        root = lxml.html.document_fromstring(html)
+        main = root.get_element_by_id(anchor, None) if anchor else None
+        if main is None:
+            main = root.find(".//main")
+        return _walk_lxml(root if main is None else main)
+
+    soup = BeautifulSoup(html, "html.parser")
+    main = (soup.find(id=anchor) if anchor else None) or soup.find("main") or soup
+    return _walk_bs4(main)
+
+def build_event(title, dt_loc_line, desc_line, default_year, fields=None):
+    """
+    Build the scraped EventRecord from its title, date/location and description lines
+    fields is the line's EventLineFields when it was already batch-normalized
+    """
+    if fields is None:
+        fields = normalize_event_lines([dt_loc_line], default_year)[0]
+
+    categories = classify_categories(title, desc_line)
+
+    return EventRecord(
+        title,
+        description=desc_line,
+        location_name=fields.building,
+        room=fields.room,
+        date=fields.date,
+        time=fields.time,
+        time_24h=fields.time_24h,
+        end_time_24h=fields.end_time_24h,
+        category=categories[0],
+        categories=categories,
+        organization_name=guess_org_name(title, desc_line),
+        organization_description=org_description_from_text(desc_line),
+    )
+
+class TitlePrefixIndex:
+    """
+    Aho-Corasick automaton over event title prefixes
+    One scan of an anchor's text finds every title prefix it contains, so
+    attributing links costs O(total anchor text) instead of O(events x anchors).
+    """
+
+    def __init__(self, prefixes):
+        self.prefixes = list(dict.fromkeys(prefixes))
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+
+        for pattern_id, prefix in enumerate(self.prefixes):
+            state = 0
+            for char in prefix:
+                if char not in self.goto[state]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                    self.goto[state][char] = len(self.goto) - 1
+                state = self.goto[state][char]
+            self.output[state].append(pattern_id)
+
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self.goto[state].items():
+                queue.append(child)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(char, 0)
+                self.output[child] = self.output[child] + self.output[self.fail[child]]
+
+    def find(self, text):
+        """Set of prefixes that occur anywhere in text"""
+        found = set()
+        state = 0
+        for char in text:
+            while state and char not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(char, 0)
+            for pattern_id in self.output[state]:
+                found.add(self.prefixes[pattern_id])
+        return found
+
+def attribute_links(events, anchors):
+    """
+    Set each event's links to the hrefs of anchors whose text contains the
+    first 30 characters of its title, in page order without duplicates
+    """
+    index = TitlePrefixIndex(event["title"][:30] for event in events)
+    links_by_prefix = {prefix: [] for prefix in index.prefixes}
+
+    for link_text, href in anchors:
+        if not link_text or not href:
+            continue
+        for prefix in index.find(link_text):
+            if href not in links_by_prefix[prefix]:
+                links_by_prefix[prefix].append(href)
+
+    for event in events:
+        event["links"] = list(links_by_prefix[event["title"][:30]])
+
+class IncrementalState:
+    """
+    Per-event fingerprints from the previous run, persisted next to this script
+    An event is identified by its title and date/location line; its fingerprint
+    also covers the description. Unchanged events are skipped before they are
+    parsed and classified, and events that disappeared from a source come back
+    as tombstones ({"title", "date", "location_name", "removed": True}).
+    Call save() only once the run's events have been written downstream.
+    """
+
+    def __init__(self, path=EVENT_STATE_FILE, full=False):
+        self.path = Path(path)
+        self.full = full
+        self.previous = {}
+        self.current = {}
+        self.stats = {'new': 0, 'modified': 0, 'unchanged': 0, 'removed': 0}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.previous = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            pass
+
+    @staticmethod
+    def fingerprint(title, dt_loc_line, desc_line):
+        return hashlib.sha256("\x1f".join([title, dt_loc_line, desc_line]).encode('utf-8')).hexdigest()
+
+    def is_changed(self, source, title, dt_loc_line, desc_line):
+        """Record the event as seen; True if it is new or modified since the last run"""
+        identity = f"{title}\n{dt_loc_line}"
+        fingerprint = self.fingerprint(title, dt_loc_line, desc_line)
+        previous = self.previous.get(source, {}).get(identity)
+        current = self.current.setdefault(source, {})
+
+        if previous and previous['fingerprint'] == fingerprint:
+            current[identity] = previous
+            self.stats['unchanged'] += 1
+            return self.full
+
+        current[identity] = {'fingerprint': fingerprint}
+        self.stats['modified' if previous else 'new'] += 1
+        return True
+
+    def record(self, source, title, dt_loc_line, event):
+        """Remember the fields a tombstone needs for an emitted event"""
+        self.current[source][f"{title}\n{dt_loc_line}"].update({
+            'title': event['title'],
+            'date': event['date'],
+            'location_name': event['location_name'],
+        })
+
+    def removed_events(self, source):
+        """Tombstones for events of source seen last run but not in this one"""
+        current = self.current.get(source, {})
+        tombstones = []
+        for identity, record in self.previous.get(source, {}).items():
+            if identity not in current and 'title' in record:
+                tombstones.append(EventRecord.tombstone(record['title'], record['date'], record['location_name']))
+        self.stats['removed'] += len(tombstones)
+        return tombstones
+
+    def summary(self):
+        return (f"{self.stats['new']} new, {self.stats['modified']} modified, "
+                f"{self.stats['unchanged']} unchanged, {self.stats['removed']} removed")
+
+    def save(self):
+        """Persist this run's fingerprints, keeping sources that were not scraped"""
+        state = dict(self.previous)
+        state.update(self.current)
+        try:
+            with open(self.path, 'w', encoding='utf-8') as f:
+                json.dump(state, f, ensure_ascii=False)
+        except OSError as e:
+            print(f"⚠️  Could not save scraper state: {e}")
+
+def iter_events(html, default_year=2025, parser=None, anchor=None, state=None, source="connections"):
+    """
+    Extract events from a Connections page in a single traversal
+    Text lines feed a three-line window (title, date/location, description) as
+    they are reached, and anchor texts are collected in the same pass. Events
+    are yielded once the walk ends, since a link for an event can appear
+    anywhere on the page. With an IncrementalState, only new or modified
+    events are built, followed by tombstones for removed ones.
+    """
+    blocks = []
+    anchors = []
+    open_anchors = []
+    window = deque()
+
+    for kind, value in iter_page_nodes(html, parser, anchor):
+        if kind == "a_start":
+            open_anchors.append([value, []])
+            continue
+        if kind == "a_end":
+            href, parts = open_anchors.pop()
+            anchors.append(("".join(parts), href))
+            continue
+
+        text = value.strip()
+        if not text:
+            continue
+        for open_anchor in open_anchors:
+            open_anchor[1].append(text)
+
+        for line in text.split("\n"):
+            line = line.strip()
+            if not line:
+                continue
+            window.append(line)
+
+            while len(window) >= 3:
+                if window[0] in SECTION_TITLES:
+                    window.popleft()
+                elif DATE_LINE_REGEX.match(window[1]):
+                    title, dt_loc_line, desc_line = window.popleft(), window.popleft(), window.popleft()
+                    if state is None or state.is_changed(source, title, dt_loc_line, desc_line):
+                        blocks.append((title, dt_loc_line, desc_line))
+                else:
+                    window.popleft()
+
+    normalized = normalize_event_lines([dt_loc_line for _, dt_loc_line, _ in blocks], default_year)
+    events = []
+    for (title, dt_loc_line, desc_line), fields in zip(blocks, normalized):
+        event = build_event(title, dt_loc_line, desc_line, default_year, fields)
+        if state is not None:
+            state.record(source, title, dt_loc_line, event)
+        events.append(event)
+
+    attribute_links(events, anchors)
+    yield from events
+    if state is not None:
+        yield from state.removed_events(source)
+
+def scrape_events(force=False, parser=None, state=None, session=None, page_cache=None):
+    """
+    Scrape events from UVA Connections page
+    Returns None if the page is unchanged since the last run (unless force)
+    With an IncrementalState, only new/modified events and tombstones are returned
+    The fetched page's cache entry is put in page_cache (a dict) for the
+    caller to save with save_page_cache once the events are stored
+    """
+    print("🌐 Fetching UVA Connections page...")
+
+    run_metrics.count("fetch", "requests")
     try:
-        resp = requests.get(URL, headers=headers, timeout=30)
-        resp.raise_for_status()
+        with run_metrics.stage("fetch"):
+            html, changed, cache_entry = fetch_page(URL, REQUEST_HEADERS, force=force, session=session)
     except requests.exceptions.RequestException as e:
+        run_metrics.count("fetch", "errors")
         print(f"❌ Error fetching page: {e}")
         return []
 
+    run_metrics.count("fetch", "bytes", len(html))
+    if not changed:
+        run_metrics.count("fetch", "unchanged_pages")
+        print("✅ Page unchanged since last run")
+        return None
+
+    if page_cache is not None and cache_entry:
+        page_cache.update(cache_entry)
     print("✅ Page fetched successfully")
-    print("📖 Parsing events...")
+    print(f"📖 Parsing events ({resolve_parser(parser)})...")
 
-    soup = BeautifulSoup(resp.text, "html.parser")
-    main = soup.find("main") or soup
-    text = main.get_text(separator="\n", strip=True)
-    lines = [line for line in text.split("\n") if line.strip()]
+    with run_metrics.stage("parse"):
+        events = list(iter_events(html, parser=parser, state=state))
+    run_metrics.count("parse", "events", len(events))
 
-    events = []
-    current_section = None
-    current_year = 2025
+    print(f"✅ Scraped {len(events)} events from the page")
+    if state is not None:
+        for key, value in state.stats.items():
+            run_metrics.record("parse", f"incremental_{key}", value)
+        print(f"🔁 Incremental: {state.summary()}")
 
-    i = 0
-    while i < len(lines) - 2:
-        line = lines[i].strip()
+    return events
 
-        if line in SECTION_TITLES:
-            current_section = line
-            i += 1
-            continue
+SourceRequest = namedtuple("SourceRequest", ["source", "url", "parse"])
+
+SOURCE_REGISTRY = {}
+
+def register_source(name):
+    """
+    Register a source factory under name
+    A factory takes the CLI options (url, issues, anchors, year, parser) and
+    returns a list of SourceRequest(source, url, parse) where parse(html)
+    yields EventRecords, normally built with build_event()
+    """
+    def decorator(factory):
+        SOURCE_REGISTRY[name] = factory
+        return factory
+    return decorator
+
+@register_source("connections")
+def connections_source(year=2025, parser=None, state=None, **_):
+    """Current Connections newsletter, the whole page (URL's fragment only positions the browser)"""
+    page_url, _ = urldefrag(URL)
+    return [SourceRequest(
+        "connections", page_url,
+        lambda html: iter_events(html, default_year=year, parser=parser, state=state, source="connections")
+    )]
+
+@register_source("connections-archive")
+def connections_archive_source(issues=(), anchors=(), year=2025, parser=None, state=None, **_):
+    """Archived Connections issues, by issue number or by #anchor on the newsletter page"""
+    pages = []
+    for issue in issues:
+        name = f"connections-archive:{issue}"
+        pages.append(SourceRequest(
+            name, CONNECTIONS_ISSUE_URL.format(issue=issue),
+            lambda html, name=name: iter_events(html, default_year=year, parser=parser, state=state, source=name)
+        ))
+    page_url, _ = urldefrag(URL)
+    for anchor in anchors:
+        anchor = anchor.lstrip("#")
+        name = f"connections-archive:#{anchor}"
+        pages.append(SourceRequest(
+            name, page_url,
+            lambda html, anchor=anchor, name=name: iter_events(
+                html, default_year=year, parser=parser, anchor=anchor, state=state, source=name
+            )
+        ))
+    return pages
+
+def iter_event_cards(html, default_year=2025):
+    """
+    Parse calendar pages that list each event in its own card element
+    (<article>, or an element with an "event" class). Within a card the first
+    line is the title, the first date line gives date/time/location and the
+    line after it is the description.
+    """
+    soup = BeautifulSoup(html, "lxml" if HAS_LXML else "html.parser")
+    cards = soup.find_all("article") or soup.select(".event, .views-row, .calendar-event")
+
+    for card in cards:
+        lines = [line for line in card.get_text(separator="\n", strip=True).split("\n") if line.strip()]
+        for i, line in enumerate(lines[1:], 1):
+            if DATE_LINE_REGEX.match(line):
+                desc_line = lines[i + 1] if i + 1 < len(lines) else ""
+                event = build_event(lines[0], line, desc_line, default_year)
+                event["links"] = [a["href"] for a in card.find_all("a", href=True)][:5]
+                yield event
+                break
+
+@register_source("department-calendar")
+def department_calendar_source(url=None, year=2025, **_):
+    """Department calendar page given with --source-url"""
+    if not url:
+        print("⚠️  department-calendar needs --source-url, skipping")
+        return []
+    return [SourceRequest(
+        f"department-calendar:{urlparse(url).netloc}", url,
+        lambda html: iter_event_cards(html, default_year=year)
+    )]
+
+async def fetch_with_retries(client, url, host_limits, per_host=PER_HOST_CONCURRENCY,
+                             retries=FETCH_RETRIES, backoff=RETRY_BACKOFF_SECONDS):
+    """
+    GET url, holding the per-host semaphore while the request is in flight
+    Retries network errors and 429/5xx with exponential backoff and jitter
+    """
+    host = urlparse(url).netloc
+    if host not in host_limits:
+        host_limits[host] = asyncio.Semaphore(per_host)
+
+    for attempt in range(retries + 1):
+        try:
+            async with host_limits[host]:
+                resp = await client.get(url)
+            if resp.status_code not in RETRYABLE_STATUS_CODES or attempt == retries:
+                resp.raise_for_status()
+                return resp.text
+        except httpx.TransportError:
+            if attempt == retries:
+                raise
+        run_metrics.count("fetch", "retries")
+        await asyncio.sleep(backoff * (2 ** attempt) * (0.5 + random.random()))
+
+def event_merge_key(event):
+    """Events from different sources/issues with the same key are the same event"""
+    return (event["title"], event.get("date"), event.get("location_name"), bool(event.get("removed")))
+
+def merge_events(event_lists):
+    """Concatenate event lists, dropping repeats of the same title, date and location"""
+    seen = set()
+    merged = []
+    for events in event_lists:
+        for event in events:
+            key = event_merge_key(event)
+            if key not in seen:
+                seen.add(key)
+                merged.append(event)
+    return merged
+
+async def scrape_sources_async(source_requests, per_host=PER_HOST_CONCURRENCY, on_page=None):
+    """
+    Fetch all sources concurrently and parse each page as soon as it arrives
+    on_page(events) is called with each page's events as soon as it is parsed
+    """
+    host_limits = {}
+
+    def parse_page(request, html):
+        with run_metrics.stage("parse"):
+            events = list(request.parse(html))
+        run_metrics.count("parse", "events", len(events))
+        return events
+
+    async def run(client, request):
+        start = asyncio.get_running_loop().time()
+        run_metrics.count("fetch", "requests")
+        try:
+            with run_metrics.stage("fetch"):
+                html = await fetch_with_retries(client, request.url, host_limits, per_host)
+        except httpx.HTTPError as e:
+            run_metrics.count("fetch", "errors")
+            print(f"❌ {request.source}: error fetching {request.url}: {str(e).splitlines()[0]}")
+            return []
+        run_metrics.count("fetch", "bytes", len(html))
+        events = await asyncio.to_thread(parse_page, request, html)
+        elapsed = asyncio.get_running_loop().time() - start
+        print(f"✅ {request.source}: {len(events)} events ({elapsed:.2f}s)")
+        if on_page is not None:
+            on_page(events)
+        return events
+
+    async with httpx.AsyncClient(headers=REQUEST_HEADERS, timeout=30, follow_redirects=True) as client:
+        results = await asyncio.gather(*(run(client, request) for request in source_requests))
+
+    return merge_events(results)
+
+def scrape_sources(source_names, per_host=PER_HOST_CONCURRENCY, **options):
+    """Scrape the named registered sources concurrently; returns merged events"""
+    if not HAS_HTTPX:
+        print("❌ Error: httpx not installed")
+        print("   Install it with: pip install httpx")
+        return []
+
+    source_requests = []
+    for name in source_names:
+        source_requests.extend(SOURCE_REGISTRY[name](**options))
 
-        next_line = lines[i + 1].strip()
-
-        if DATE_LINE_REGEX.match(next_line):
-            title = line
-            dt_loc_line = next_line
-            desc_line = lines[i + 2].strip() if i + 2 < len(lines) else ""
-
-            date_str, time_str, location_str = parse_date_time_location(dt_loc_line, default_year=current_year)
-            location_name, room = split_location(location_str)
-
-            category = classify_categories(title, desc_line)
-            org_name = guess_org_name(title, desc_line)
-            org_description = org_description_from_text(desc_line)
-
-            event = {
-                "title": title,
-                "description": desc_line,
-                "location_name": location_name,
-                "room": room,
-                "date": date_str,
-                "time": time_str,
-                "time_24h": convert_time_to_24h(time_str),
-                "category": category,
-                "organization_name": org_name,
-                "organization_description": org_description,
-                "links": []
-            }
-
-            events.append(event)
-            i += 3
+    print(f"🌐 Fetching {len(source_requests)} pages from {len(source_names)} sources...")
+    events = asyncio.run(scrape_sources_async(source_requests, per_host))
+    print(f"✅ Scraped {len(events)} unique events from all sources")
+
+    return events
+
+def iter_sources(source_names, per_host=PER_HOST_CONCURRENCY, **options):
+    """
+    Like scrape_sources, but a generator: the async engine runs in a background
+    thread and each page's events are yielded (deduplicated) as soon as that
+    page is parsed, while the remaining pages are still being fetched. An
+    error in the engine is raised here, so the caller never mistakes it for
+    the end of the pages
+    """
+    if not HAS_HTTPX:
+        print("❌ Error: httpx not installed")
+        print("   Install it with: pip install httpx")
+        return
+
+    source_requests = []
+    for name in source_names:
+        source_requests.extend(SOURCE_REGISTRY[name](**options))
+
+    print(f"🌐 Fetching {len(source_requests)} pages from {len(source_names)} sources...")
+    pages = queue.Queue()
+
+    def run_engine():
+        try:
+            asyncio.run(scrape_sources_async(source_requests, per_host, on_page=pages.put))
+        except BaseException as e:
+            pages.put(e)
         else:
-            i += 1
+            pages.put(None)
 
-    all_links = main.find_all("a")
-    for event in events:
-        matches = []
-        for a in all_links:
-            link_text = a.get_text(strip=True)
-            if link_text and event["title"][:30] in link_text:
-                href = a.get("href")
-                if href and href not in matches:
-                    matches.append(href)
-        event["links"] = matches
+    threading.Thread(target=run_engine, daemon=True).start()
 
-    print(f"✅ Scraped {len(events)} events from the page")
+    seen = set()
+    while (events := pages.get()) is not None:
+        if isinstance(events, BaseException):
+            raise events
+        for event in events:
+            key = event_merge_key(event)
+            if key not in seen:
+                seen.add(key)
+                yield event
 
+def connections_issue_dates(since, until, weekday=CONNECTIONS_ISSUE_WEEKDAY):
+    """Publication dates of the weekly issues between since and until (inclusive)"""
+    first = since + timedelta(days=(weekday - since.weekday()) % 7)
+    if first > until:
+        return []
+    return [first + timedelta(weeks=n) for n in range((until - first).days // 7 + 1)]
+
+def infer_event_year(event, issue_date):
+    """
+    Move an event to the year that puts it closest to its issue's date
+    Newsletter dates have no year, so a December issue announcing "Jan. 8"
+    means January of the next year
+    """
+    try:
+        event_date = datetime.strptime(event.get("date") or "", "%m/%d/%Y").date()
+    except ValueError:
+        return event
+
+    best = event_date
+    for year in (issue_date.year - 1, issue_date.year + 1):
+        try:
+            candidate = event_date.replace(year=year)
+        except ValueError:
+            continue
+        if abs((candidate - issue_date).days) < abs((best - issue_date).days):
+            best = candidate
+    event["date"] = best.strftime("%m/%d/%Y")
+    return event
+
+def parse_issue(html, issue_date, parser=None):
+    """
+    Parse one archived issue (runs in a backfill worker process)
+    Returns (events, seconds spent parsing)
+    """
+    start = time.perf_counter()
+    source = f"connections-archive:{issue_date.strftime(ISSUE_DATE_SLUG_FORMAT)}"
+    events = [infer_event_year(event, issue_date)
+              for event in iter_events(html, default_year=issue_date.year, parser=parser, source=source)]
+    return events, time.perf_counter() - start
+
+async def backfill_async(issue_dates, parser=None, per_host=PER_HOST_CONCURRENCY, workers=None):
+    """
+    Fetch the issues concurrently and hand each page to a process pool as it arrives
+    Returns one event list per issue, in issue_dates order (empty for failed issues)
+    """
+    host_limits = {}
+    loop = asyncio.get_running_loop()
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        async def run(client, issue_date):
+            slug = issue_date.strftime(ISSUE_DATE_SLUG_FORMAT)
+            url = CONNECTIONS_ISSUE_DATE_URL.format(issue_date=slug)
+            run_metrics.count("fetch", "requests")
+            try:
+                with run_metrics.stage("fetch"):
+                    html = await fetch_with_retries(client, url, host_limits, per_host)
+            except httpx.HTTPError as e:
+                run_metrics.count("fetch", "errors")
+                print(f"⚠️  Issue {slug}: error fetching {url}: {str(e).splitlines()[0]}")
+                return []
+            run_metrics.count("fetch", "bytes", len(html))
+
+            events, seconds = await loop.run_in_executor(pool, parse_issue, html, issue_date, parser)
+            run_metrics.add_time("parse", seconds)
+            run_metrics.count("parse", "events", len(events))
+            print(f"✅ Issue {slug}: {len(events)} events")
+            return events
+
+        async with httpx.AsyncClient(headers=REQUEST_HEADERS, timeout=30, follow_redirects=True) as client:
+            return await asyncio.gather(*(run(client, issue_date) for issue_date in issue_dates))
+
+def backfill_connections(since, until, parser=None, per_host=PER_HOST_CONCURRENCY, workers=None):
+    """
+    Scrape every weekly Connections issue published between since and until
+    Pages are fetched with bounded per-host concurrency and parsed across a
+    process pool, since HTML parsing is CPU-bound. Each issue's events get
+    their year from the issue date. An event announced by several issues is
+    kept once, in the version from the newest issue
+    """
+    if not HAS_HTTPX:
+        print("❌ Error: httpx not installed")
+        print("   Install it with: pip install httpx")
+        return []
+
+    issue_dates = connections_issue_dates(since, until)
+    print(f"🗄️  Backfilling {len(issue_dates)} issues from {since} to {until} "
+          f"({workers or os.cpu_count()} parser processes)...")
+    results = asyncio.run(backfill_async(issue_dates, parser, per_host, workers))
+
+    events = merge_events(reversed(results))
+    run_metrics.record("parse", "unique_events", len(events))
+    print(f"✅ Backfilled {len(events)} unique events from "
+          f"{sum(1 for issue_events in results if issue_events)} of {len(issue_dates)} issues")
     return events
 
+def iter_scraped_events(force=False, parser=None, sources=None, per_host=PER_HOST_CONCURRENCY, state=None,
+                        session=None, page_cache=None, **options):
+    """
+    Single entry point for downstream consumers
+    Returns None if the newsletter page is unchanged since the last run,
+    otherwise an iterator of scraped events (changes and tombstones only when
+    an IncrementalState is given). The newsletter page's cache entry goes to
+    page_cache, to be saved after the events are written
+    """
+    if sources:
+        return iter_sources(sources, per_host=per_host, parser=parser, state=state, **options)
+
+    events = scrape_events(force=force, parser=parser, state=state, session=session, page_cache=page_cache)
+    return None if events is None else iter(events)
+
 def save_events_to_json(events, filename="uva_connections_events.json"):
-    """Save scraped events to JSON file"""
-    with open(filename, "w", encoding="utf-8") as f:
-        json.dump(events, f, indent=2, ensure_ascii=False)
-    print(f"💾 Saved events to {filename}")
+    """
+    Save scraped events to filename
+    .ndjson, .parquet and .arrow are written too (see event_records.write_events)
+    """
+    if write_events(events, filename) is not None:
+        print(f"💾 Saved events to {filename}")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scrape events from the UVA Connections newsletter")
+    parser.add_argument("--force", action="store_true",
+                        help="Ignore the page cache and always re-parse the page")
+    parser.add_argument("--parser", choices=PARSER_CHOICES, default="auto",
+                        help="HTML parser backend (auto uses lxml when installed)")
+    parser.add_argument("--source", action="append", choices=sorted(SOURCE_REGISTRY),
+                        help="Scrape these registered sources concurrently (repeatable)")
+    parser.add_argument("--source-url", help="Page URL for sources that take one")
+    parser.add_argument("--issue", action="append", default=[],
+                        help="Archived issue number for connections-archive (repeatable)")
+    parser.add_argument("--anchor", action="append", default=[],
+                        help="Newsletter #anchor for connections-archive (repeatable)")
+    parser.add_argument("--year", type=int, default=2025, help="Year for dates without one")
+    parser.add_argument("--per-host", type=int, default=PER_HOST_CONCURRENCY,
+                        help="Concurrent requests allowed per host")
+    parser.add_argument("--backfill", nargs=2, metavar=("SINCE", "UNTIL"), type=date.fromisoformat,
+                        help="Scrape every weekly archived issue between two YYYY-MM-DD dates")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Parser processes for --backfill (default: one per CPU)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only output events that changed since the last incremental run, plus removals. "
+                             "State is saved once the file is written, so if populating it fails those changes "
+                             "are not output again; run-event-pipeline.py saves it only after the writes succeed")
+    parser.add_argument("--output", default="uva_connections_events.json",
+                        help="Events file to write: .json, .ndjson, or .parquet/.arrow (needs pyarrow)")
+    parser.add_argument("--report", metavar="PATH",
+                        help=f"Write per-stage run metrics to PATH (.json, or .prom for Prometheus; "
+                             f"default ${run_metrics.REPORT_ENV_VAR})")
+    args = parser.parse_args()
+
     print("🚀 Starting UVA Connections Events Scraper\n")
 
     env_vars = load_env()
     if not env_vars:
         exit(1)
 
-    events = scrape_events()
+    # Backfilled history is not tracked, so it can't reset the incremental state
+    state = IncrementalState(full=args.force) if args.incremental and not args.backfill else None
+    page_cache = {}
+
+    with run_metrics.profiled():
+        if args.backfill:
+            events = backfill_connections(*args.backfill, parser=args.parser, per_host=args.per_host,
+                                          workers=args.workers)
+        elif args.source:
+            events = scrape_sources(
+                args.source, per_host=args.per_host, url=args.source_url, issues=args.issue,
+                anchors=args.anchor, year=args.year, parser=args.parser, state=state
+            )
+        else:
+            events = scrape_events(force=args.force, parser=args.parser, state=state, page_cache=page_cache)
+    run_metrics.write_report(args.report)
 
-    if events:
-        save_events_to_json(events)
+    if events is None:
+        print("\n✨ Nothing to do, events are already up to date")
+    elif events:
+        save_events_to_json(events, args.output)
+        if page_cache:
+            save_page_cache(page_cache)
+        if state is not None:
+            # Only the file is known to be written here; run-event-pipeline.py
+            # is the failure-safe path, saving state after the database writes
+            state.save()
         print(f"\n✨ Scraping complete! Found {len(events)} events")
         print("\n📊 Sample event:")
-        print(json.dumps(events[0], indent=2))
+        print(json.dumps(events[0].to_dict(), indent=2))
     else:
         print("❌ No events found")
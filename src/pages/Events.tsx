@@ -65,6 +65,7 @@ const Events = () => {
       const { data, error } = await supabase
         .from('events')
         .select('*')
+        .is('deleted_at', null)
         .order('event_date', { ascending: true });
 
       if (error) throw error;
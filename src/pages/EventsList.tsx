@@ -42,6 +42,7 @@ const EventsList = () => {
       const { data, error } = await supabase
         .from('events')
         .select('*')
+        .is('deleted_at', null)
         .order('event_date', { ascending: true });
 
       if (error) throw error;
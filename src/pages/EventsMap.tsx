@@ -54,6 +54,7 @@ const EventsMap = () => {
       const { data, error } = await supabase
         .from('events')
         .select('*')
+        .is('deleted_at', null)
         .order('event_date', { ascending: true });
 
       if (error) throw error;
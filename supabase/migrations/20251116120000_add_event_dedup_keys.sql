@@ -0,0 +1,57 @@
+/*
+  # Add Dedup Keys to Events
+
+  1. Changes
+    - Add `event_key` (text) - Natural key of scraped events: normalized title + event date + location
+    - Add `content_hash` (text) - SHA-256 of the scraped event content, used to skip unchanged rows
+    - Add unique index on `event_key` so the populator can upsert on it
+
+  2. Security
+    - Allow public reads of system events that have an `event_key`. The populator (anon key)
+      looks up existing keys and content hashes to skip unchanged events, and Postgres only
+      lets ON CONFLICT DO UPDATE, UPDATE and RETURNING reach rows the caller can SELECT
+    - Allow public updates of the same rows, so the populator can upsert changed events
+    - Events created by users are still only readable by authenticated users and only
+      updatable by their owner
+
+  3. Notes
+    - User-created events leave both columns NULL; NULLs never conflict in the unique index
+    - Re-running populate-events-database.py on an unchanged newsletter performs no writes
+    - In production, you may want to use the service role key instead
+*/
+
+DO $$
+BEGIN
+  IF NOT EXISTS (
+    SELECT 1 FROM information_schema.columns
+    WHERE table_name = 'events' AND column_name = 'event_key'
+  ) THEN
+    ALTER TABLE events ADD COLUMN event_key text;
+  END IF;
+
+  IF NOT EXISTS (
+    SELECT 1 FROM information_schema.columns
+    WHERE table_name = 'events' AND column_name = 'content_hash'
+  ) THEN
+    ALTER TABLE events ADD COLUMN content_hash text;
+  END IF;
+END $$;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_events_event_key ON events(event_key);
+
+DROP POLICY IF EXISTS "Allow system reads for scraped events" ON events;
+
+CREATE POLICY "Allow system reads for scraped events"
+  ON events
+  FOR SELECT
+  TO public
+  USING (created_by = '00000000-0000-0000-0000-000000000000'::uuid AND event_key IS NOT NULL);
+
+DROP POLICY IF EXISTS "Allow system updates for scraped events" ON events;
+
+CREATE POLICY "Allow system updates for scraped events"
+  ON events
+  FOR UPDATE
+  TO public
+  USING (created_by = '00000000-0000-0000-0000-000000000000'::uuid AND event_key IS NOT NULL)
+  WITH CHECK (created_by = '00000000-0000-0000-0000-000000000000'::uuid AND event_key IS NOT NULL);
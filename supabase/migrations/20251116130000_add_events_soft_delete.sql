@@ -0,0 +1,48 @@
+/*
+  # Soft Delete for Scraped Events
+
+  1. Changes
+    - Add `deleted_at` (timestamptz) - Set when an event disappears from the newsletter it was scraped from
+    - Add partial index on `event_date` for events that are not deleted
+
+  2. Security
+    - Setting and clearing `deleted_at` are updates of system events. An UPDATE only reaches rows
+      the caller can SELECT, so they need both the SELECT and the UPDATE policy for system events
+      from add_event_dedup_keys; they are (re)created here so soft deletes never depend on
+      migration order. Without the SELECT policy the anon key's update matches 0 rows and still
+      returns 200
+
+  3. Notes
+    - populate-events-database.py --soft-delete-removed sets `deleted_at` instead of deleting rows
+    - Upserting an event that reappears clears `deleted_at` again
+    - The events pages only select rows where `deleted_at` IS NULL
+*/
+
+DO $$
+BEGIN
+  IF NOT EXISTS (
+    SELECT 1 FROM information_schema.columns
+    WHERE table_name = 'events' AND column_name = 'deleted_at'
+  ) THEN
+    ALTER TABLE events ADD COLUMN deleted_at timestamptz;
+  END IF;
+END $$;
+
+CREATE INDEX IF NOT EXISTS idx_events_active_event_date ON events(event_date) WHERE deleted_at IS NULL;
+
+DROP POLICY IF EXISTS "Allow system reads for scraped events" ON events;
+
+CREATE POLICY "Allow system reads for scraped events"
+  ON events
+  FOR SELECT
+  TO public
+  USING (created_by = '00000000-0000-0000-0000-000000000000'::uuid AND event_key IS NOT NULL);
+
+DROP POLICY IF EXISTS "Allow system updates for scraped events" ON events;
+
+CREATE POLICY "Allow system updates for scraped events"
+  ON events
+  FOR UPDATE
+  TO public
+  USING (created_by = '00000000-0000-0000-0000-000000000000'::uuid AND event_key IS NOT NULL)
+  WITH CHECK (created_by = '00000000-0000-0000-0000-000000000000'::uuid AND event_key IS NOT NULL);
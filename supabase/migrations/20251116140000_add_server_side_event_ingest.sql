@@ -0,0 +1,171 @@
+/*
+  # Server-Side Event Matching and Ingest
+
+  1. Extensions
+    - Enable `pg_trgm` for trigram similarity on building names
+
+  2. Indexes
+    - GiST trigram index on lower(buildings.name), used for nearest-name lookups (`<->`)
+
+  3. Functions
+    - `ingest_scraped_events(scraped_events jsonb, min_similarity real)` - Matches a batch of
+      scraped events to buildings and rooms and upserts them on `event_key` in one statement.
+      Returns counts: received, unchanged, matched, random_assignment, inserted, updated
+
+  4. Notes
+    - Used by populate-events-database.py --server-match, so the client no longer downloads
+      the buildings and rooms tables
+    - Each element has the events columns plus `location_query` (normalized location name)
+      and `room_hint` (room given in the newsletter)
+    - Events whose `content_hash` is unchanged are skipped; soft-deleted events are restored
+    - Locations with no building above `min_similarity` get a random building, like the client
+    - Rooms are picked by the room hint, then at random: unlike the client's RoomScheduler,
+      this ignores room capacity, bookings and rooms other events already hold
+    - SECURITY DEFINER: run as the anon key, the dedup join and ON CONFLICT could not see
+      existing rows, so every event looked new and re-runs failed RLS. It writes only system
+      events instead: every row gets `created_by` = the system user whatever the caller sent,
+      and an incoming event whose key belongs to any other row is skipped
+*/
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm WITH SCHEMA extensions;
+
+CREATE INDEX IF NOT EXISTS idx_buildings_name_trgm
+  ON buildings USING gist (lower(name) extensions.gist_trgm_ops);
+
+CREATE OR REPLACE FUNCTION ingest_scraped_events(scraped_events jsonb, min_similarity real DEFAULT 0.3)
+RETURNS jsonb AS $$
+DECLARE
+  result jsonb;
+BEGIN
+  PERFORM set_config('pg_trgm.similarity_threshold', min_similarity::text, true);
+
+  WITH incoming AS (
+    -- Last occurrence wins when a batch repeats an event_key
+    SELECT DISTINCT ON (doc->>'event_key')
+      doc->>'event_key' AS event_key,
+      doc->>'content_hash' AS content_hash,
+      doc->>'title' AS title,
+      COALESCE(doc->>'description', '') AS description,
+      lower(COALESCE(doc->>'location_query', '')) AS location_query,
+      NULLIF(doc->>'room_hint', '') AS room_hint,
+      (doc->>'event_date')::date AS event_date,
+      (doc->>'event_time')::time AS event_time,
+      COALESCE(doc->>'category', 'Other') AS category,
+      COALESCE(doc->>'organization_name', '') AS organization_name,
+      COALESCE(doc->>'organization_description', '') AS organization_description,
+      doc->>'instagram_link' AS instagram_link,
+      doc->>'website_link' AS website_link,
+      doc->>'doorlist_link' AS doorlist_link,
+      COALESCE(doc->'custom_links', '[]'::jsonb) AS custom_links
+    FROM jsonb_array_elements(scraped_events) WITH ORDINALITY AS e(doc, ordinal)
+    WHERE doc->>'event_key' IS NOT NULL
+    ORDER BY doc->>'event_key', ordinal DESC
+  ),
+  changed AS (
+    SELECT i.*
+    FROM incoming i
+    LEFT JOIN events ev ON ev.event_key = i.event_key
+    WHERE ev.id IS NULL
+      OR (ev.created_by = '00000000-0000-0000-0000-000000000000'::uuid
+          AND (ev.deleted_at IS NOT NULL OR ev.content_hash IS DISTINCT FROM i.content_hash))
+  ),
+  matched AS (
+    SELECT c.*, m.id AS building_id, m.name AS building_name, m.latitude, m.longitude
+    FROM changed c
+    LEFT JOIN LATERAL (
+      SELECT b.id, b.name, b.latitude, b.longitude
+      FROM buildings b
+      WHERE c.location_query <> '' AND lower(b.name) % c.location_query
+      ORDER BY lower(b.name) <-> c.location_query, b.id
+      LIMIT 1
+    ) m ON true
+  ),
+  placed AS (
+    SELECT
+      mt.*,
+      mt.building_id IS NOT NULL AS name_matched,
+      COALESCE(mt.building_id, fallback.id) AS place_id,
+      COALESCE(mt.building_name, fallback.name) AS place_name,
+      COALESCE(mt.latitude, fallback.latitude) AS place_latitude,
+      COALESCE(mt.longitude, fallback.longitude) AS place_longitude
+    FROM matched mt
+    LEFT JOIN LATERAL (
+      SELECT b.id, b.name, b.latitude, b.longitude
+      FROM buildings b
+      WHERE mt.building_id IS NULL
+      ORDER BY random()
+      LIMIT 1
+    ) fallback ON true
+  ),
+  upserted AS (
+    INSERT INTO events (
+      title, description, location_name, room, latitude, longitude, event_date, event_time,
+      category, organization_name, organization_description, instagram_link, website_link,
+      doorlist_link, custom_links, created_by, event_key, content_hash, deleted_at
+    )
+    SELECT
+      p.title,
+      p.description,
+      p.place_name,
+      COALESCE(
+        (SELECT r.room_name
+         FROM rooms r
+         WHERE r.building_id = p.place_id
+         ORDER BY (p.room_hint IS NOT NULL AND r.room_name ILIKE '%' || p.room_hint || '%') DESC, random()
+         LIMIT 1),
+        p.room_hint,
+        'Room ' || (100 + floor(random() * 300))::int
+      ),
+      p.place_latitude,
+      p.place_longitude,
+      p.event_date,
+      p.event_time,
+      p.category,
+      p.organization_name,
+      p.organization_description,
+      p.instagram_link,
+      p.website_link,
+      p.doorlist_link,
+      p.custom_links,
+      '00000000-0000-0000-0000-000000000000'::uuid,
+      p.event_key,
+      p.content_hash,
+      NULL
+    FROM placed p
+    WHERE p.place_id IS NOT NULL
+    ON CONFLICT (event_key) DO UPDATE SET
+      title = EXCLUDED.title,
+      description = EXCLUDED.description,
+      location_name = EXCLUDED.location_name,
+      room = EXCLUDED.room,
+      latitude = EXCLUDED.latitude,
+      longitude = EXCLUDED.longitude,
+      event_date = EXCLUDED.event_date,
+      event_time = EXCLUDED.event_time,
+      category = EXCLUDED.category,
+      organization_name = EXCLUDED.organization_name,
+      organization_description = EXCLUDED.organization_description,
+      instagram_link = EXCLUDED.instagram_link,
+      website_link = EXCLUDED.website_link,
+      doorlist_link = EXCLUDED.doorlist_link,
+      custom_links = EXCLUDED.custom_links,
+      content_hash = EXCLUDED.content_hash,
+      deleted_at = NULL,
+      updated_at = now()
+    WHERE events.created_by = '00000000-0000-0000-0000-000000000000'::uuid
+    RETURNING (xmax = 0) AS was_inserted
+  )
+  SELECT jsonb_build_object(
+    'received', (SELECT count(*) FROM incoming),
+    'unchanged', (SELECT count(*) FROM incoming) - (SELECT count(*) FROM changed),
+    'matched', (SELECT count(*) FROM placed WHERE name_matched),
+    'random_assignment', (SELECT count(*) FROM placed WHERE NOT name_matched AND place_id IS NOT NULL),
+    'inserted', (SELECT count(*) FROM upserted WHERE was_inserted),
+    'updated', (SELECT count(*) FROM upserted WHERE NOT was_inserted)
+  ) INTO result;
+
+  RETURN result;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public, extensions;
+
+GRANT EXECUTE ON FUNCTION ingest_scraped_events(jsonb, real) TO anon, authenticated;
@@ -0,0 +1,45 @@
+/*
+  # Booked Room Slots
+
+  1. Functions
+    - `booked_room_slots(from_date date, to_date date)` - Room and time of every confirmed
+      booking between the two dates (inclusive)
+    - `event_room_slots(from_date date, to_date date)` - Room and time of every event that is
+      not deleted between the two dates (inclusive), including events created in the app
+
+  2. Security
+    - SECURITY DEFINER, so the event populator (anon key) can see which rooms are taken
+      even though bookings RLS only shows users their own bookings, and events RLS only
+      shows it system events
+    - Return no user, note, status, title or description columns, only where and when
+      each room is taken
+
+  3. Notes
+    - Used by populate-events-database.py to avoid placing scraped events in booked rooms
+      or in rooms other events already hold
+    - Both order their rows, so callers can page through them with limit/offset
+    - Served by the existing idx_bookings_room_date, idx_bookings_status and
+      idx_events_active_event_date indexes
+*/
+
+CREATE OR REPLACE FUNCTION booked_room_slots(from_date date, to_date date)
+RETURNS TABLE (room_id uuid, booking_date date, start_time time, end_time time) AS $$
+  SELECT b.room_id, b.booking_date, b.start_time, b.end_time
+  FROM bookings b
+  WHERE b.status = 'confirmed'
+    AND b.booking_date BETWEEN from_date AND to_date
+  ORDER BY b.room_id, b.booking_date, b.start_time;
+$$ LANGUAGE sql STABLE SECURITY DEFINER SET search_path = public;
+
+GRANT EXECUTE ON FUNCTION booked_room_slots(date, date) TO anon, authenticated;
+
+CREATE OR REPLACE FUNCTION event_room_slots(from_date date, to_date date)
+RETURNS TABLE (id uuid, event_key text, location_name text, room text, event_date date, event_time time) AS $$
+  SELECT e.id, e.event_key, e.location_name, e.room, e.event_date, e.event_time
+  FROM events e
+  WHERE e.deleted_at IS NULL
+    AND e.event_date BETWEEN from_date AND to_date
+  ORDER BY e.id;
+$$ LANGUAGE sql STABLE SECURITY DEFINER SET search_path = public;
+
+GRANT EXECUTE ON FUNCTION event_room_slots(date, date) TO anon, authenticated;
@@ -0,0 +1,147 @@
+/*
+  # Building Event Snapshots
+
+  1. New Tables
+    - `building_event_snapshots` - One row per building with its upcoming events
+      - `building_id` (uuid, primary key) - References buildings
+      - `building_name` (text) - Building name, as in events.location_name
+      - `latitude`, `longitude` (decimal) - Building coordinates, joined from buildings
+      - `event_count` (integer) - Number of upcoming events
+      - `first_event_date` (date) - Earliest upcoming event, null when there are none
+      - `days` (jsonb) - Upcoming events bucketed by date: {"2025-11-16": [event, ...]}, times ascending
+      - `content_hash` (text) - Hash of `days`, so unchanged snapshots are not rewritten
+      - `generated_at` (timestamptz) - When the row was last rebuilt
+
+  2. Functions
+    - `refresh_building_snapshots(building_names text[])` - Rebuilds the snapshots of the named
+      buildings (every building when NULL) plus any snapshot whose first day has passed, from
+      the events table. Rows whose content hash is unchanged are not rewritten.
+      Returns counts: rebuilt, unchanged
+
+  3. Indexes
+    - `first_event_date`, to find snapshots whose first day has passed
+
+  4. Security
+    - Enable RLS; authenticated users can read snapshots, like events. Snapshots include
+      app-created events, which events RLS does not show to anonymous visitors
+    - No INSERT or UPDATE policies: snapshots are only written by refresh_building_snapshots,
+      which is SECURITY DEFINER and builds every row from the events table, so a caller can
+      ask for a refresh but cannot choose what readers see
+
+  5. Notes
+    - Called by populate-events-database.py --publish-snapshots after its writes finish, with
+      the buildings whose events changed
+    - Events created from the app are not included until the next refresh
+*/
+
+CREATE TABLE IF NOT EXISTS building_event_snapshots (
+  building_id uuid PRIMARY KEY REFERENCES buildings(id) ON DELETE CASCADE,
+  building_name text NOT NULL,
+  latitude decimal(10, 8) NOT NULL,
+  longitude decimal(11, 8) NOT NULL,
+  event_count integer NOT NULL DEFAULT 0,
+  first_event_date date,
+  days jsonb NOT NULL DEFAULT '{}'::jsonb,
+  content_hash text,
+  generated_at timestamptz DEFAULT now()
+);
+
+ALTER TABLE building_event_snapshots ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Authenticated users can view building event snapshots"
+  ON building_event_snapshots
+  FOR SELECT
+  TO authenticated
+  USING (true);
+
+CREATE INDEX IF NOT EXISTS idx_building_event_snapshots_first_event_date
+  ON building_event_snapshots(first_event_date);
+
+CREATE OR REPLACE FUNCTION refresh_building_snapshots(building_names text[] DEFAULT NULL)
+RETURNS jsonb AS $$
+DECLARE
+  result jsonb;
+BEGIN
+  WITH targets AS (
+    SELECT b.id, b.name, b.latitude, b.longitude
+    FROM buildings b
+    WHERE building_names IS NULL
+      OR b.name = ANY(building_names)
+      OR b.id IN (
+        SELECT s.building_id FROM building_event_snapshots s WHERE s.first_event_date < current_date
+      )
+  ),
+  upcoming AS (
+    SELECT
+      t.id AS building_id,
+      e.event_date,
+      count(*) AS event_count,
+      jsonb_agg(jsonb_build_object(
+        'id', e.id,
+        'title', e.title,
+        'description', e.description,
+        'room', e.room,
+        'event_time', e.event_time,
+        'category', e.category,
+        'organization_name', e.organization_name,
+        'organization_description', e.organization_description,
+        'organization_logo', e.organization_logo,
+        'instagram_link', e.instagram_link,
+        'website_link', e.website_link,
+        'doorlist_link', e.doorlist_link,
+        'custom_links', e.custom_links,
+        'image_url', e.image_url
+      ) ORDER BY e.event_time NULLS FIRST, e.title, e.id) AS events
+    FROM targets t
+    JOIN events e
+      ON e.location_name = t.name
+      AND e.event_date >= current_date
+      AND e.deleted_at IS NULL
+    GROUP BY t.id, e.event_date
+  ),
+  built AS (
+    SELECT
+      t.id,
+      t.name,
+      t.latitude,
+      t.longitude,
+      COALESCE(sum(u.event_count), 0)::integer AS event_count,
+      min(u.event_date) AS first_event_date,
+      COALESCE(
+        jsonb_object_agg(u.event_date::text, u.events) FILTER (WHERE u.event_date IS NOT NULL),
+        '{}'::jsonb
+      ) AS days
+    FROM targets t
+    LEFT JOIN upcoming u ON u.building_id = t.id
+    GROUP BY t.id, t.name, t.latitude, t.longitude
+  ),
+  written AS (
+    INSERT INTO building_event_snapshots (
+      building_id, building_name, latitude, longitude, event_count, first_event_date, days,
+      content_hash, generated_at
+    )
+    SELECT id, name, latitude, longitude, event_count, first_event_date, days, md5(days::text), now()
+    FROM built
+    ON CONFLICT (building_id) DO UPDATE SET
+      building_name = EXCLUDED.building_name,
+      latitude = EXCLUDED.latitude,
+      longitude = EXCLUDED.longitude,
+      event_count = EXCLUDED.event_count,
+      first_event_date = EXCLUDED.first_event_date,
+      days = EXCLUDED.days,
+      content_hash = EXCLUDED.content_hash,
+      generated_at = EXCLUDED.generated_at
+    WHERE building_event_snapshots.content_hash IS DISTINCT FROM EXCLUDED.content_hash
+      OR building_event_snapshots.building_name IS DISTINCT FROM EXCLUDED.building_name
+    RETURNING 1
+  )
+  SELECT jsonb_build_object(
+    'rebuilt', (SELECT count(*) FROM written),
+    'unchanged', (SELECT count(*) FROM built) - (SELECT count(*) FROM written)
+  ) INTO result;
+
+  RETURN result;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+GRANT EXECUTE ON FUNCTION refresh_building_snapshots(text[]) TO anon, authenticated;
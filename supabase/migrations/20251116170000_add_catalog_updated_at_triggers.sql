@@ -0,0 +1,37 @@
+/*
+  # Keep Catalog updated_at Current
+
+  1. Functions
+    - `set_updated_at()` - Trigger function that sets `updated_at` to now() on every update
+
+  2. Triggers
+    - `buildings_set_updated_at` - BEFORE UPDATE on buildings
+    - `rooms_set_updated_at` - BEFORE UPDATE on rooms
+
+  3. Notes
+    - `updated_at` only had a DEFAULT, so it changed on insert but not on in-place edits
+      (names, coordinates, capacity, `available`)
+    - populate-events-database.py fingerprints these tables by row count and latest
+      `updated_at` to decide when its location match cache and a resident process's
+      catalog are stale; with the triggers, edits change the fingerprint too
+*/
+
+CREATE OR REPLACE FUNCTION set_updated_at()
+RETURNS trigger AS $$
+BEGIN
+  NEW.updated_at = now();
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS buildings_set_updated_at ON buildings;
+
+CREATE TRIGGER buildings_set_updated_at
+  BEFORE UPDATE ON buildings
+  FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+
+DROP TRIGGER IF EXISTS rooms_set_updated_at ON rooms;
+
+CREATE TRIGGER rooms_set_updated_at
+  BEFORE UPDATE ON rooms
+  FOR EACH ROW EXECUTE FUNCTION set_updated_at();